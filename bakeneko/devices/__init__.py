@@ -4,11 +4,15 @@
 Pre-baked PCIe Devices
 '''
 
-from torii.build.plat  import Platform
+from typing            import TYPE_CHECKING
+
 from torii.hdl         import Elaboratable, Module
 
 from ..interface.pipe  import PIPEInterface
 
+if TYPE_CHECKING:
+	from torii.build.plat import Platform
+
 class PCIeDevice(Elaboratable):
 	'''
 	A somewhat generic PCIe device.
@@ -22,7 +26,7 @@ class PCIeDevice(Elaboratable):
 	def __init__(self, *, phy: PIPEInterface) -> None:
 		self.phy = phy
 
-	def elaborate(self, platform: Platform | None) -> Module:
+	def elaborate(self, platform: 'Platform | None') -> Module:
 		m = Module()
 
 		return m
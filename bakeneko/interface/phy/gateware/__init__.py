@@ -15,8 +15,18 @@ to do so.
 
 '''
 
-from .phy import GatewarePhy
+from typing import TYPE_CHECKING
+
+from ....support.lazy import lazy_imports
+
+if TYPE_CHECKING:
+	from .phy import GatewarePhy
 
 __all__ = (
 	'GatewarePhy',
 )
+
+# Public names and the submodule that provides them, they are only imported on first access
+__getattr__ = lazy_imports(globals(), {
+	'GatewarePhy': '.phy',
+})
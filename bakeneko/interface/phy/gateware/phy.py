@@ -4,13 +4,17 @@
 Bakeneko pure gateware PCIe PHY
 '''
 
-from torii.build.plat import Platform
+from typing           import TYPE_CHECKING
+
 from torii.hdl.dsl    import Module
 from torii.hdl.ir     import Elaboratable
 
 from .receiver        import Receiver
 from .transmitter     import Transmitter
 
+if TYPE_CHECKING:
+	from torii.build.plat import Platform
+
 __all__ = (
 	'GatewarePhy',
 )
@@ -23,7 +27,7 @@ class GatewarePhy(Elaboratable):
 	def __init__(self) -> None:
 		pass
 
-	def elaborate(self, platform: Platform | None) -> Module:
+	def elaborate(self, platform: 'Platform | None') -> Module:
 		m = Module()
 
 		m.submodules.tx = tx = Transmitter()
@@ -4,23 +4,13 @@
 Bakeneko GatewarePHY Receiver machinery
 '''
 
-from torii.build.plat import Platform
-from torii.hdl.dsl    import Module
-from torii.hdl.ir     import Elaboratable
+from ....support.stub import EmptyElaboratable
 
 __all__ = (
 	'Receiver',
 )
 
-class Receiver(Elaboratable):
+class Receiver(EmptyElaboratable):
 	'''
 
 	'''
-
-	def __init__(self) -> None:
-		pass
-
-	def elaborate(self, platform: Platform | None) -> Module:
-		m = Module()
-
-		return m
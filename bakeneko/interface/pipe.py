@@ -20,6 +20,14 @@ __all__ = (
 	'PIPEInterface',
 )
 
+# TODO(aki): Enum?
+# Map interface width to data_bus_width signal values
+_DATA_BUS_WIDTH_CONST = {
+	8:  Const(0b10, 2),
+	16: Const(0b01, 2),
+	32: Const(0b00, 2),
+}
+
 class PIPEInterface(Elaboratable):
 	'''
 	Torii PHY Interface for the PCI Express and USB SuperSpeed Architectures (PIPE)
@@ -144,16 +152,55 @@ class PIPEInterface(Elaboratable):
 		If the provided width is not supported by this PIPE interface.
 	'''
 
-	# TODO(aki): Enum?
-	# Map interface width to data_bus_width signal values
-	_WIDTH_MODE = {
-		8:  0b10,
-		16: 0b01,
-		32: 0b00,
-	}
+	# Clocking + Reset
+	rst:  Signal
+	clk:  Signal
+	pclk: Signal
+
+	# Control
+	powerdown: Signal
+	rate:      Signal
+
+	tx_loopback:   Signal
+	tx_elec_idle:  Signal
+	tx_compliance: Signal
+	tx_deemph:     Signal
+	tx_margin:     Signal
+	tx_swing:      Signal
+
+	rx_polarity: Signal
+
+	# Status
+	phy_status:   Signal
+	rx_valid:     Signal
+	rx_elec_idle: Signal
+	rx_status:    Signal
+
+	# The (attribute, shape, name) of every signal whose shape does not depend on the interface width
+	_SIGNAL_SPEC: tuple[tuple[str, int | type[LinkSpeed], str], ...] = (
+		# Clocking + Reset
+		('rst',           1,         'PIPE/Reset'),
+		('clk',           1,         'PIPE/Clk'),
+		('pclk',          1,         'PIPE/PClk'),
+		# Control
+		('powerdown',     2,         'PIPE/Powerdown'),         # TODO(aki): Enum?
+		('rate',          LinkSpeed, 'PIPE/Rate'),
+		('tx_loopback',   1,         'PIPE/TX/Loopback'),
+		('tx_elec_idle',  1,         'PIPE/TX/ElectricalIdle'),
+		('tx_compliance', 1,         'PIPE/TX/Compliance'),
+		('tx_deemph',     2,         'PIPE/TX/Deemphasis'),     # TODO(aki): Enum?
+		('tx_margin',     3,         'PIPE/TX/Margin'),         # TODO(aki): Enum?
+		('tx_swing',      1,         'PIPE/TX/Swing'),
+		('rx_polarity',   1,         'PIPE/RX/Polarity'),
+		# Status
+		('phy_status',    1,         'PIPE/PHYStatus'),
+		('rx_valid',      1,         'PIPE/RX/Valid'),
+		('rx_elec_idle',  1,         'PIPE/RX/ElectricalIdle'),
+		('rx_status',     3,         'PIPE/RX/Status'),         # TODO(aki): Enum?
+	)
 
 	def __init__(self, width: Literal[8, 16, 32] = 8) -> None:
-		if width not in (8, 16, 32):
+		if (data_bus_width := _DATA_BUS_WIDTH_CONST.get(width)) is None:
 			raise PIPEInterfaceError(
 				f'PIPE Interface does not support width of {width}, only 8, 16, or 32'
 			)
@@ -162,35 +209,16 @@ class PIPEInterface(Elaboratable):
 		self.width_bits   = width
 		self.width_symbol = width // 8
 
-		# Clocking + Reset
-		self.rst  = Signal(name = 'PIPE/Reset')
-		self.clk  = Signal(name = 'PIPE/Clk')
-		self.pclk = Signal(name = 'PIPE/PClk')
+		# Fixed-shape signals
+		for attr, shape, name in self._SIGNAL_SPEC:
+			setattr(self, attr, Signal(shape, name = name))
 
-		# Tx/Rx Data
+		# Tx/Rx Data, these depend on the interface width
 		self.tx_data  = Signal(self.width_bits,   name = 'PIPE/TX/Data')
 		self.tx_datak = Signal(self.width_symbol, name = 'PIPE/TX/DataK')
 
 		self.rx_data  = Signal(self.width_bits,   name = 'PIPE/RX/Data')
 		self.rx_datak = Signal(self.width_symbol, name = 'PIPE/RX/DataK')
 
-		# Control
-		self.powerdown = Signal(2,         name = 'PIPE/Powerdown') # TODO(aki): Enum?
-		self.rate      = Signal(LinkSpeed, name = 'PIPE/Rate')
-
-		self.tx_loopback   = Signal(name = 'PIPE/TX/Loopback')
-		self.tx_elec_idle  = Signal(name = 'PIPE/TX/ElectricalIdle')
-		self.tx_compliance = Signal(name = 'PIPE/TX/Compliance')
-		self.tx_deemph     = Signal(2, name = 'PIPE/TX/Deemphasis') # TODO(aki): Enum?
-		self.tx_margin     = Signal(3, name = 'PIPE/TX/Margin') # TODO(aki): Enum?
-		self.tx_swing      = Signal(name = 'PIPE/TX/Swing')
-
-		self.rx_polarity = Signal(name = 'PIPE/RX/Polarity')
-
 		# Status
-		self.phy_status     = Signal(name = 'PIPE/PHYStatus')
-		self.data_bus_width = Const(self._WIDTH_MODE[self.width_bits], 2)
-
-		self.rx_valid     = Signal(name = 'PIPE/RX/Valid')
-		self.rx_elec_idle = Signal(name = 'PIPE/RX/ElectricalIdle')
-		self.rx_status    = Signal(3, name = 'PIPE/RX/Status') # TODO(aki): Enum?
+		self.data_bus_width = data_bus_width
@@ -4,25 +4,52 @@
 Line-coding helpers and definitions.
 '''
 
-from enum      import Enum, IntEnum
+from collections.abc import Iterable
+from enum            import Enum, IntEnum
+from functools       import lru_cache
 
-from torii.hdl import Const
+from torii.hdl       import Const, Value
 
 __all__ = (
-	'K', 'D', 'Symbol', 'Symbols',
+	'K', 'D', 'Symbol', 'SymbolType', 'Symbols', 'KNOWN_CONTROL_SYMBOLS', 'classify_symbols',
 )
 
 
+# NOTE(aki): Only the raw value is cached, each call still builds its own `Const`, as Torii IR nodes
+#            carry the `src_loc` of where they were made and shouldn't be shared between users.
+@lru_cache(maxsize = None)
+def _replicate(value: int, width: int, repeat: int) -> int:
+	''' Returns ``value`` repeated ``repeat`` times, packed LSB first into ``width`` bit fields '''
+
+	res = 0
+	for _ in range(repeat):
+		res = (res << width) | value
+	return res
+
 def K(x: int, y: int)  -> int:
 	''' Returns the 8b/10b encoded value for the given K symbol. '''
 
+	# NOTE(aki): Out of range components would otherwise silently alias into another symbol
+	if not (0 <= x < 32 and 0 <= y < 8):
+		raise ValueError(f'Invalid symbol K{x}.{y}')
 	return 0x100 | (y << 5) | x
 
 def D(x: int, y: int)  -> int:
 	''' Returns the 8b/10b encoded value for the given D symbol '''
 
+	if not (0 <= x < 32 and 0 <= y < 8):
+		raise ValueError(f'Invalid symbol D{x}.{y}')
 	return (y << 5) | x
 
+class SymbolType(IntEnum):
+	''' Named symbol type '''
+	CONTROL = 0
+	DATA    = 1
+
+# Bound at module scope so the hot construction paths avoid the enum attribute lookups
+_SYM_CTRL = SymbolType.CONTROL
+_SYM_DATA = SymbolType.DATA
+
 class Symbol:
 	'''
 	A simple encapsulation for PCIe 8b/10b named symbols
@@ -35,7 +62,7 @@ class Symbol:
 	value : int
 		The numerical value of the symbol. Normally the result of a call to :ref:`D` or :ref:`K`.
 
-	sym_type : Symbol.Type
+	sym_type : SymbolType
 		The type of symbol this is, either Control or Data.
 
 	description : str
@@ -43,89 +70,105 @@ class Symbol:
 
 	'''
 
-	class Type(IntEnum):
-		''' Named symbol type '''
-		CONTROL = 0
-		DATA    = 1
+	__slots__ = ('value', 'sym_type', 'name', 'description', '_x', '_y', '_str', '_repr')
+
+	Type = SymbolType
 
 	@staticmethod
 	def control(name: str, value: int, description: str = '') -> 'Symbol':
 		''' Construct a named control symbol '''
-		return Symbol((value & 0xFF), sym_type = Symbol.Type.CONTROL, name = name, description = description)
+		return Symbol._fast_new((value & 0xFF), _SYM_CTRL, name, description)
 
 	@staticmethod
 	def data(name: str, value: int, description: str = '') -> 'Symbol':
 		''' Construct a named data symbol '''
-		return Symbol(value, sym_type = Symbol.Type.DATA, name = name, description = description)
+		return Symbol._fast_new(value, _SYM_DATA, name, description)
 
 	@staticmethod
 	def from_bits(bits: int, *, name: str = '', description: str = '') -> 'Symbol | None':
 		''' Convert a 10-bit code into a Symbol object if possible '''
-		x = (bits & 0b00011111)
-		y = (bits & 0b11100000) >> 5
-
 		if (bits & 0x1FF) == 0x1EE:
 			return None
-		else:
-			# Check to see if we know about this symbol already
-			known_sym = next(filter(lambda s: s.value.decompose() == (x, y), iter(Symbols)), None)
-			if known_sym is not None:
-				return known_sym.value # Unpack the enum value to a raw Symbol
 
-			# If we don't we can construct one with an empty name/desc
-			sym_type = Symbol.Type.CONTROL if (bits & 0x100) else Symbol.Type.DATA
-			return Symbol((y << 5) | x, sym_type = sym_type, name = name, description = description)
+		value = (bits & 0xFF)
+
+		# Check to see if we know about this symbol already
+		known_sym = _SYMBOL_BY_VALUE.get(value)
+		if known_sym is not None:
+			return known_sym
+
+		# If we don't we can construct one with an empty name/desc
+		sym_type = _SYM_CTRL if (bits & 0x100) else _SYM_DATA
+		return Symbol._fast_new(value, sym_type, name, description)
 
 
-	def __init__(self, value: int, *, sym_type: 'Symbol.Type | None' = None, name: str = '', description: str = '') -> None:
-		self.value = value
+	@classmethod
+	def _fast_new(cls, value: int, sym_type: SymbolType, name: str, description: str) -> 'Symbol':
+		''' Construct a symbol with an already known type, bypassing the argument handling in ``__init__`` '''
+		sym = cls.__new__(cls)
+		sym._setup(value, sym_type, name, description)
+		return sym
 
+	def __init__(self, value: int, *, sym_type: SymbolType | None = None, name: str = '', description: str = '') -> None:
 		if sym_type is None:
-			self.sym_type = Symbol.Type.CONTROL if (value & 0x100) else Symbol.Type.DATA
-		else:
-			self.sym_type = sym_type
+			sym_type = _SYM_CTRL if (value & 0x100) else _SYM_DATA
 
+		self._setup(value, sym_type, name, description)
+
+	def _setup(self, value: int, sym_type: SymbolType, name: str, description: str) -> None:
+		''' Populate all of the symbol attributes '''
+		self.value       = value
+		self.sym_type    = sym_type
 		self.name        = name
 		self.description = description
 
+		# The value is fixed after construction, so we can pre-split it into its components
+		self._x = (value & 0b00011111)
+		self._y = (value & 0b11100000) >> 5
+
+		# Likewise for the string representations
+		ty      = 'K' if sym_type == _SYM_CTRL else 'D'
+		sym_rep = f'{ty}{self._x}.{self._y}'
+
+		self._str  = sym_rep if name == '' else f'{name} ({sym_rep})'
+		self._repr = f'<Symbol: {sym_rep}, value=0x{value:02X}, name=\'{name}\', desc=\'{description}\'>'
+
 	def x(self) -> int:
 		''' Return the x component of the symbol '''
-		return (self.value & 0b00011111)
+		return self._x
 
 	def y(self) -> int:
 		''' Return the y component of the symbol '''
-		return (self.value & 0b11100000) >> 5
+		return self._y
 
 
 	def decompose(self) -> tuple[int, int]:
 		''' Decompose a symbol value into an (x, y) pair '''
-		return (self.x(), self.y())
+		return (self._x, self._y)
 
-	def as_value(self, *, repeat: int = 1) -> Const:
+	def as_value(self, *, repeat: int = 1) -> Value:
 		''' Returns the data value of this symbol as a Torii :ref:`Const` '''
 
-		value = Const(self.value, 8)
-		return value.replicate(repeat)
+		return Const(_replicate(self.value, 8, repeat), 8 * repeat)
 
-	def as_ctrl(self, *, repeat: int = 1) -> Const:
+	def as_ctrl(self, *, repeat: int = 1) -> Value:
 		''' Returns the ctrl value of this symbol as a Torii :ref:`Const` '''
 
-		ctrl = Const(int(self.sym_type), 1)
-		return ctrl.replicate(repeat)
+		return Const(_replicate(int(self.sym_type), 1, repeat), repeat)
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, Symbol):
+			return NotImplemented
+		return self.value == other.value and self.sym_type == other.sym_type
+
+	def __hash__(self) -> int:
+		return self.value
 
 	def __str__(self) -> str:
-		ty      = 'K' if self.sym_type == Symbol.Type.CONTROL else 'D'
-		sym_rep = f'{ty}{self.x()}.{self.y()}'
-		if self.name == '':
-			return f'{""}{sym_rep}'
-		else:
-			return f'{self.name} ({sym_rep})'
+		return self._str
 
 	def __repr__(self) -> str:
-		ty      = 'K' if self.sym_type == Symbol.Type.CONTROL else 'D'
-		sym_rep = f'{ty}{self.x()}.{self.y()}'
-
-		return f'<Symbol: {sym_rep}, value=0x{self.value:02X}, name=\'{self.name}\', desc=\'{self.description}\'>'
+		return self._repr
 
 
 class Symbols(Enum):
@@ -144,5 +187,53 @@ class Symbols(Enum):
 	RV1 = Symbol.control('RV1', K(28, 6), 'Reserved')
 	EIE = Symbol.control('EIE', K(28, 7), 'Electrical Idle Exit')
 
+	_str: str
+
 	def __str__(self) -> str:
-		return str(self.value)
+		return self._str
+
+# The known named symbols in definition order, iterating a tuple avoids going through `EnumMeta` each time
+_SYMBOLS: tuple[Symbols, ...] = tuple(Symbols)
+
+# Enum members are singletons, so stash the string form of each one up front
+for _sym in _SYMBOLS:
+	_sym._str = str(_sym.value)
+del _sym
+
+# All of the known named symbols, for constant-time membership checks
+KNOWN_CONTROL_SYMBOLS: frozenset[Symbol] = frozenset(sym.value for sym in _SYMBOLS)
+
+# Map of the raw 8-bit symbol value to the known symbol, used by `Symbol.from_bits`
+_SYMBOL_BY_VALUE: dict[int, Symbol] = { sym.value.value: sym.value for sym in _SYMBOLS }
+
+# Map of the raw 8-bit symbol value to the index of the matching `Symbols` member
+_SYMBOL_INDEX_BY_VALUE: dict[int, int] = { sym.value.value: idx for idx, sym in enumerate(_SYMBOLS) }
+
+# Classification of every 9-bit code, the index of the matching `Symbols` member, `-1` if the code is not a
+# known symbol, or `-2` for the `0x1EE` code `Symbol.from_bits` rejects.
+_CLASSIFY_TABLE: tuple[int, ...] = tuple(
+	-2 if code == 0x1EE else _SYMBOL_INDEX_BY_VALUE.get(code & 0xFF, -1) for code in range(0x200)
+)
+
+def classify_symbols(codes: Iterable[int]) -> list[int]:
+	'''
+	Classify a stream of 10-bit codes against the known PCIe named symbols.
+
+	This follows the same matching rules as :py:meth:`Symbol.from_bits`, but rather than
+	constructing a :py:class:`Symbol` per code it does a single table lookup, which makes it
+	suitable for bulk analysis of captured line data.
+
+	Parameters
+	----------
+	codes : Iterable[int]
+		The codes to classify.
+
+	Returns
+	-------
+	list[int]
+		For each code, the index of the matching :py:class:`Symbols` member, ``-1`` if it is
+		not a known symbol, or ``-2`` if it is not a valid symbol at all.
+	'''
+
+	table = _CLASSIFY_TABLE
+	return [ table[code & 0x1FF] for code in codes ]
@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+'''
+Lazily importing the public names of a package from its submodules.
+'''
+
+from collections.abc import Callable, Mapping
+from importlib       import import_module
+from typing          import Any
+
+__all__ = (
+	'lazy_imports',
+)
+
+def lazy_imports(module_globals: dict[str, Any], imports: Mapping[str, str]) -> Callable[[str], object]:
+	'''
+	Build a module level :pep:`562` ``__getattr__`` that only imports the given names on first access.
+
+	This keeps importing a package cheap when its submodules pull in heavy dependencies that not
+	every user of the package needs.
+
+	Parameters
+	----------
+	module_globals : dict[str, Any]
+		The ``globals()`` of the module, each name is stored in them once imported so later accesses
+		don't go through ``__getattr__`` again.
+
+	imports : Mapping[str, str]
+		The names and the submodule that provides each of them, relative to the module's package.
+
+	Returns
+	-------
+	Callable[[str], object]
+		The ``__getattr__`` for the module.
+	'''
+
+	module  = module_globals['__name__']
+	package = module_globals['__package__']
+
+	def __getattr__(name: str) -> object:
+		if (submodule := imports.get(name)) is not None:
+			value = module_globals[name] = getattr(import_module(submodule, package), name)
+			return value
+
+		raise AttributeError(f'module {module!r} has no attribute {name!r}')
+
+	return __getattr__
@@ -0,0 +1,33 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+'''
+Placeholder machinery for not-yet-implemented gateware
+'''
+
+from typing        import TYPE_CHECKING
+
+from torii.hdl.dsl import Module
+from torii.hdl.ir  import Elaboratable
+
+if TYPE_CHECKING:
+	from torii.build.plat import Platform
+
+__all__ = (
+	'EmptyElaboratable',
+)
+
+class EmptyElaboratable(Elaboratable):
+	'''
+	An :py:class:`Elaboratable` that takes no parameters and elaborates to an empty :py:class:`Module`.
+
+	Unimplemented gateware subclasses this until it grows a real implementation, which keeps
+	them all in one place and easy to find.
+	'''
+
+	def __init__(self) -> None:
+		pass
+
+	def elaborate(self, platform: 'Platform | None') -> Module:
+		m = Module()
+
+		return m
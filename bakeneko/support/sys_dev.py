@@ -4,23 +4,196 @@
 A PCIe device wrapper for Linux PCIe devices.
 '''
 
-import logging  as log
-from pathlib    import Path
-from subprocess import run, PIPE
-from functools  import cached_property
+import logging           as log
+import os
+import re
+from collections.abc     import Iterator
+from concurrent.futures  import ThreadPoolExecutor
+from fnmatch             import fnmatchcase
+from importlib.util      import find_spec
+from pathlib             import Path
+from subprocess          import run, PIPE
+from typing              import Any, TYPE_CHECKING
 
-try:
+from ..types.constants import LinkSpeed, LinkWidth
+from .lazy             import lazy_imports
+
+if TYPE_CHECKING:
 	from fabric import Connection
-	HAS_FABRIC = True
-except ImportError:
-	HAS_FABRIC = False
 
-from ..types.constants import LinkSpeed, LinkWidth
+# NOTE(aki): Importing fabric (and with it paramiko) is the bulk of the time it takes to import
+#            this module, so we only check it is there, the remote support is in `sys_dev_remote`
+#            and only gets pulled in when it is actually used.
+HAS_FABRIC = find_spec('fabric') is not None
 
 SYS_PCI_PATH   = Path('/sys/bus/pci')
 PCI_DEVS_PATH  = SYS_PCI_PATH / 'devices'
 SYS_PCI_RESCAN = SYS_PCI_PATH / 'rescan'
 
+# String forms of the above, for building shell commands and opening files
+_SYS_PCI_RESCAN_STR = str(SYS_PCI_RESCAN)
+
+# Sentinel for a `PCIDevice` property that has not yet been read
+_MISSING: Any = object()
+
+# Maximum number of threads used to read device nodes when enumerating
+ENUMERATE_WORKERS = 16
+
+# The `setpci` register operations we can do directly on the config space,
+# that is `[CAP_EXP+]<offset>.<width>[=<value>[:<mask>]]`
+_SETPCI_OP = re.compile(
+	r'^(?P<cap>CAP_EXP\+)?(?P<offset>[0-9a-fA-F]+)\.(?P<width>[BWL])'
+	r'(?:=(?P<value>[0-9a-fA-F]+)(?::(?P<mask>[0-9a-fA-F]+))?)?$'
+)
+_SETPCI_WIDTHS = { 'B': 1, 'W': 2, 'L': 4 }
+
+# PCI Express Capability ID
+PCI_CAP_ID_EXP = 0x10
+
+# A single parsed `setpci` operation: (relative to CAP_EXP, offset, width, write value, write mask)
+_ConfigOp = tuple[bool, int, int, int | None, int]
+
+def _parse_setpci_ops(cap: str) -> list[_ConfigOp] | None:
+	''' Parse `setpci` operations, returning None if any of them are not simple register accesses '''
+
+	ops: list[_ConfigOp] = []
+	for op in cap.split():
+		if (match := _SETPCI_OP.match(op)) is None:
+			return None
+
+		width = _SETPCI_WIDTHS[match['width']]
+		value = None if match['value'] is None else int(match['value'], base = 16)
+		mask  = (1 << (width * 8)) - 1 if match['mask'] is None else int(match['mask'], base = 16)
+
+		ops.append((match['cap'] is not None, int(match['offset'], base = 16), width, value, mask))
+	return ops
+
+def _pci_config_read(fd: int, offset: int, width: int) -> int:
+	''' Read a little-endian register from a PCI config space '''
+
+	data = os.pread(fd, width, offset)
+	if len(data) != width:
+		# NOTE(aki): Unprivileged users only get the first 64 bytes of the config space
+		raise ValueError(f'Short config space read at 0x{offset:02x}')
+	return int.from_bytes(data, 'little')
+
+def _pci_config_write(fd: int, offset: int, width: int, value: int) -> None:
+	''' Write a little-endian register to a PCI config space '''
+
+	os.pwrite(fd, value.to_bytes(width, 'little'), offset)
+
+def _pci_find_cap_exp(fd: int) -> int:
+	''' Walk the capability list of a PCI config space to find the PCI Express Capability '''
+
+	# Check the `Capabilities List` bit in the status register
+	if not (_pci_config_read(fd, 0x06, 2) & 0x10):
+		raise LookupError('Device has no capabilities list')
+
+	ptr = _pci_config_read(fd, 0x34, 1) & 0xFC
+	# There can be at most 48 capabilities in the 192 bytes after the header
+	for _ in range(48):
+		if ptr == 0:
+			break
+
+		cap = _pci_config_read(fd, ptr, 2)
+		if (cap & 0xFF) == PCI_CAP_ID_EXP:
+			return ptr
+		ptr = (cap >> 8) & 0xFC
+
+	raise LookupError('Device has no PCI Express Capability')
+
+class _PartialConfigAccess(Exception):
+	''' A direct config space access failed after some of its writes were already done '''
+
+def _pci_config_access(config: Path, ops: list[_ConfigOp]) -> str:
+	'''
+	Perform the given `setpci` operations on the config space file of a device.
+
+	The result is formatted like the output of `setpci`, each read value on its own line.
+
+	If an operation fails after a write has already been done then :py:class:`_PartialConfigAccess`
+	is raised, as the access can't just be re-done with `setpci` without repeating those writes.
+	'''
+
+	writes = any(value is not None for _, _, _, value, _ in ops)
+	fd = os.open(config, os.O_RDWR if writes else os.O_RDONLY)
+	try:
+		# Find the capability up front, so not having one can't leave the access half done
+		cap_exp = _pci_find_cap_exp(fd) if any(relative for relative, *_ in ops) else 0
+		reads: list[str] = []
+		written = False
+
+		for relative, offset, width, value, mask in ops:
+			if relative:
+				offset += cap_exp
+
+			try:
+				if value is None:
+					reads.append(f'{_pci_config_read(fd, offset, width):0{width * 2}x}\n')
+					continue
+
+				if mask != (1 << (width * 8)) - 1:
+					value = (_pci_config_read(fd, offset, width) & ~mask) | (value & mask)
+				_pci_config_write(fd, offset, width, value)
+				written = True
+			except (OSError, ValueError) as e:
+				if written:
+					raise _PartialConfigAccess(f'Config space access failed after writing to it: {e}') from e
+				raise
+
+		return ''.join(reads)
+	finally:
+		os.close(fd)
+
+def _parse_register(reg: str, value: str) -> int | None:
+	''' Parse the `setpci` output for a ``<reg>.<B|W|L>`` register, checking it is a value of the right width '''
+
+	if len(value) != _SETPCI_WIDTHS[reg[-1]] * 2:
+		log.debug('Malformed value \'%s\' for register \'%s\'', value, reg)
+		return None
+
+	try:
+		return int(value, base = 16)
+	except ValueError:
+		log.debug('Malformed value \'%s\' for register \'%s\'', value, reg)
+		return None
+
+def _parse_registers(regs: tuple[str, ...], values: str | None) -> tuple[int | None, ...]:
+	''' Parse the `setpci` output for multiple ``<reg>.<B|W|L>`` registers read in one go '''
+
+	if values is None:
+		return (None,) * len(regs)
+
+	if len(split := values.split()) != len(regs):
+		log.debug('Expected %d values for registers %s, got \'%s\'', len(regs), regs, split)
+		return (None,) * len(regs)
+
+	return tuple(_parse_register(reg, value) for reg, value in zip(regs, split))
+
+# The PCI Express Capabilities, Link Capabilities 1, and Link Status registers
+_LINK_REGISTERS     = ('CAP_EXP+02.W', 'CAP_EXP+0c.L', 'CAP_EXP+12.W')
+_LINK_REGISTERS_STR = ' '.join(_LINK_REGISTERS)
+
+# What a device slot glob may contain, as the remote side hands it to the shell to expand it has to be
+# restricted to the characters that can actually appear in a slot name along with the glob ones.
+_SLOT_GLOB = re.compile(r'[0-9a-f:.*?!\[\]-]+')
+
+def _check_slot_glob(glob: str) -> str:
+	''' Normalize a device slot glob, raising a ValueError if it contains anything other than slot or glob characters '''
+
+	if _SLOT_GLOB.fullmatch(glob := glob.lower()) is None:
+		raise ValueError(f'Invalid device slot glob \'{glob}\'')
+	return glob
+
+def _parse_uevent(data: str) -> dict[str, str]:
+	''' Parse the ``KEY=value`` lines of a device ``uevent`` file '''
+
+	info: dict[str, str] = {}
+	for line in data.splitlines():
+		key, sep, value = line.partition('=')
+		if sep:
+			info[key.strip()] = value.strip()
+	return info
 
 __all__ = (
 	'PCIDevice',
@@ -31,6 +204,8 @@ __all__ = (
 # TODO(aki): Replace once the proper PCIe register infra is set up
 class LinkStatus:
 
+	__slots__ = ('value', 'link_speed', 'link_width', 'link_training', 'slot_clock', 'dll_active', '_rsvd')
+
 	def __init__(self, value: int) -> None:
 		self.value = value
 
@@ -59,6 +234,11 @@ class LinkStatus:
 # TODO(aki): Same as above
 class LinkCapabilities:
 
+	__slots__ = (
+		'value', 'max_speed', 'max_width', 'active_state_pm', 'l0s_exit_latency', 'l1_exit_latency', 'clock_pm',
+		'spde_reporting', 'dlla_reporting', 'lbwn_reporting', 'aspmop_compliant', '_rsvd', 'port_number',
+	)
+
 	def __init__(self, value: int) -> None:
 		self.value = value
 
@@ -117,20 +297,59 @@ class PCIDevice:
 		Device ID
 	'''
 
+	__slots__ = (
+		'slot', 'node', 'vendor', 'device', 'port',
+		'_node_str', '_remove', '_reset', '_max_ls', '_max_lw',
+		'_cache_use_port', '_cache_link_status', '_cache_link_capabilities',
+		'_cache_max_speed', '_cache_max_width', '_cache_link_speed', '_cache_link_width',
+	)
+
 	@staticmethod
-	def enumerate() -> list['PCIDevice']:
+	def enumerate(glob: str = '*') -> list['PCIDevice']:
 		'''
 		Get a list of PCI(e) devices attached to the system
 
+		Parameters
+		----------
+		glob : str
+			Only get the devices whose slot matches this glob, e.g. ``0000:01:*``. (default: ``*``)
+
 		Returns
 		-------
 		list[PCIDevice]
 			All found PCI(e) devices
 		'''
-		devs: list[PCIDevice] = list()
-		for d in PCI_DEVS_PATH.iterdir():
-			devs.append(PCIDevice.from_path(d))
-		return devs
+		glob = _check_slot_glob(glob)
+		with os.scandir(PCI_DEVS_PATH) as entries:
+			paths = [ Path(entry.path) for entry in entries if glob == '*' or fnmatchcase(entry.name, glob) ]
+
+		# Each device is a handful of small sysfs reads, so overlap them rather than going one-by-one
+		with ThreadPoolExecutor(max_workers = min(ENUMERATE_WORKERS, len(paths) or 1)) as pool:
+			return list(pool.map(PCIDevice.from_path, paths))
+
+	@staticmethod
+	def enumerate_iter(glob: str = '*') -> Iterator['PCIDevice']:
+		'''
+		Lazily iterate over the PCI(e) devices attached to the system
+
+		Unlike :py:meth:`enumerate` devices are only read as they are consumed, so stopping at the
+		first device of interest avoids reading in all the rest.
+
+		Parameters
+		----------
+		glob : str
+			Only get the devices whose slot matches this glob, e.g. ``0000:01:*``. (default: ``*``)
+
+		Returns
+		-------
+		Iterator[PCIDevice]
+			All found PCI(e) devices
+		'''
+		glob = _check_slot_glob(glob)
+		with os.scandir(PCI_DEVS_PATH) as entries:
+			for entry in entries:
+				if glob == '*' or fnmatchcase(entry.name, glob):
+					yield PCIDevice.from_path(Path(entry.path))
 
 	@staticmethod
 	def get(slot: str) -> 'PCIDevice | None':
@@ -178,20 +397,19 @@ class PCIDevice:
 			A new PCI(e) device wrapper
 		'''
 
-		with (path / 'uevent').open('r') as f:
-			info = dict(map(lambda s: s.strip().split('='), f.readlines()))
+		info = _parse_uevent((path / 'uevent').read_text())
 		vendor, device = info['PCI_ID'].split(':')
 		slot = info['PCI_SLOT_NAME']
 
-		return PCIDevice(slot, vendor, device)
+		dev = PCIDevice(slot, vendor, device)
+		dev._post_setup()
+		return dev
 
 	# All our remote device helpers and APIs
 	if HAS_FABRIC:
 
-		_remote_connection: Connection | None
-
 		@staticmethod
-		def enumerate_remote(conn: Connection) -> list['PCIDevice']:
+		def enumerate_remote(conn: 'Connection', glob: str = '*') -> list['PCIDevice']:
 			'''
 			Get a list of PCI(e) devices attached to the remote system
 
@@ -200,30 +418,61 @@ class PCIDevice:
 			conn : fabric.Connection
 				The connection to use.
 
+			glob : str
+				Only get the devices whose slot matches this glob, e.g. ``0000:01:*``. This is
+				expanded on the remote, so non-matching devices are never read. (default: ``*``)
+
 			Returns
 			-------
 			list[PCIDevice]
 				All found PCI(e) devices
 			'''
 
-			devs: list[PCIDevice] = list()
-
 			# Due to interacting over a remote pipe, we need to invoke some shell gubbins
 			# and do string parsing.
-
-			res = conn.run(f'ls {PCI_DEVS_PATH!s}', hide = True)
+			#
+			# NOTE(aki): Rather than doing a round-trip per-device, we dump the device node link,
+			#            `uevent` file, link registers, and sysfs max link speed and width for every
+			#            device in one go. Each of those is split off with a record separator, and
+			#            each device is followed by a NUL so we can split them back apart.
+			#
+			# NOTE(aki): If the glob matches nothing the shell leaves it as-is, hence skipping anything
+			#            that doesn't exist.
+			res = conn.run(
+				f'for d in {PCI_DEVS_PATH!s}/{_check_slot_glob(glob)}; do [ -e "$d" ] || continue; '
+				'readlink "$d"; cat "$d/uevent"; printf \'\\036\'; '
+				f'setpci -s "${{d##*/}}" {_LINK_REGISTERS_STR} 2>/dev/null; printf \'\\036\'; '
+				'cat "$d/max_link_speed" 2>/dev/null; printf \'\\036\'; '
+				'cat "$d/max_link_width" 2>/dev/null; printf \'\\0\'; done',
+				hide = True
+			)
 			if not res.ok:
-				return devs
-
-			for d in res.stdout.split():
-				devs.append(PCIDevice.from_remote_path(
-					PCI_DEVS_PATH / d, conn
+				return []
+
+			from .sys_dev_remote import _RemotePCIDevice
+
+			devs: list[PCIDevice] = []
+			regs: dict[str, tuple[int | None, ...]] = {}
+			for entry in res.stdout.split('\0'):
+				if len(fields := entry.split('\x1e')) != 4:
+					continue
+				dev_info, values, max_speed, max_width = fields
+				link, _, uevent = dev_info.strip().partition('\n')
+				if uevent == '':
+					continue
+
+				devs.append(dev := _RemotePCIDevice.from_uevent(
+					uevent, conn, link, (max_speed.strip(), max_width.strip())
 				))
+				regs[dev.slot] = _parse_registers(_LINK_REGISTERS, values)
 
+			# NOTE(aki): Ports are devices too, so their registers are in the dump as well
+			for dev in devs:
+				dev._seed_link_registers(regs[dev.slot], regs.get(dev.port))
 			return devs
 
 		@staticmethod
-		def get_remote(slot: str, conn: Connection) -> 'PCIDevice | None':
+		def get_remote(slot: str, conn: 'Connection') -> 'PCIDevice | None':
 			'''
 			Get a PCIDevice from the give device/slot ID on the remote system.
 
@@ -258,7 +507,7 @@ class PCIDevice:
 			return PCIDevice.from_remote_path(DEV_PATH, conn)
 
 		@staticmethod
-		def from_remote_path(path: Path, conn: Connection) -> 'PCIDevice':
+		def from_remote_path(path: Path, conn: 'Connection') -> 'PCIDevice':
 			'''
 			Construct a PCIDevice from a device node path
 
@@ -276,176 +525,114 @@ class PCIDevice:
 				A new PCI(e) device wrapper
 			'''
 
-			res = conn.run(f'cat {path / "uevent"!s}', hide = True)
-			info = dict(map(lambda s: s.strip().split('='), res.stdout.split()))
-
-			vendor, device = info['PCI_ID'].split(':')
-			slot = info['PCI_SLOT_NAME']
-
-			dev = PCIDevice(slot, vendor, device)
-			dev._remote_connection = conn
-			dev._post_setup()
-			return dev
-
-		def _remote_run(self, cmd: str, warn: bool = True, hide: bool = True):
-			log.debug(f' ==> \'{cmd}\'')
-			res = self._remote_connection.run(cmd, warn = warn, hide = hide)
-			log.debug(f' <== {res}')
-
-			return res
-
-		def _remote_path_exists(self, path: Path) -> bool:
-			res = self._remote_run(f'[ -e {path!s} ]')
-			return res.ok
-
-		def _remote_run_exists(self, path: Path, cmd: str):
-			res = self._remote_run(f'[ -e {path!s} ] && {cmd}')
-			return res
-
-		def _get_capability_remote(self, cap: str, port: bool) -> str | None:
-			target = self.port if port else self.slot
-			res = self._remote_run(f'setpci -s {target} {cap}')
-			if res.ok:
-				return res.stdout.strip()
-			log.debug(f'Get capability failed: {res.stderr.strip()}')
-			return None
-
-		def _max_speed_remote(self) -> str:
-			res = self._remote_run_exists(self._max_ls, f'cat {self._max_ls!s}')
-			if res.ok:
-				return res.stdout.strip()
-			return 'Unknown'
-
-		def _max_width_remote(self) -> str:
-			res = self._remote_run_exists(self._max_lw, f'cat {self._max_lw!r}')
-			if res.ok:
-				return res.stdout.strip()
-			return 'Unknown'
-
-		def _recycle_remote(self) -> bool:
-			log.info('Removing this device')
-			self._remote_run_exists(self._remove, f'echo 1 > {self._remove!s}')
-
-			log.info('Re-scanning bus...')
-			self._remote_run_exists(SYS_PCI_RESCAN, f'echo 1 > {SYS_PCI_RESCAN!s}')
-
-			log.info('Checking to ensure we\'re a valid device again')
-			if not self._remote_path_exists(self.node):
-				log.error('Device didn\'t come back!')
-				return False
-			log.info('Looks like we\'re back, happy days')
-			return True
+			from .sys_dev_remote import _RemotePCIDevice
 
-		def _reset_remote(self) -> None:
-			self._remote_run_exists(self._reset, f'echo 1 > {self._reset!s}')
-
-		def _repr_remote(self) -> str:
-			return (
-				'<PCIDevice[Remote] '
-				f'slot={self.slot} port={self.port} vendor={self.vendor} device={self.device} '
-				f'host={self._remote_connection.host}'
-				'>'
-			)
-
-		def _readlink_remote(self, path: Path) -> Path:
-			res = self._remote_run(f'readlink {path!s}')
-			if not res.ok:
-				return path
+			res = conn.run(f'cat {path / "uevent"!s}', hide = True)
+			return _RemotePCIDevice.from_uevent(res.stdout, conn)
 
-			link_path = Path(res.stdout.strip())
-			if link_path.is_relative_to(path):
-				return (path / link_path)
-			return link_path
+	def _impl_get_capability(self, cap: str, port: bool) -> str | None:
+		target = self.port if port else self.slot
 
-	else:
-		# Stub for remote type stuff
-		_remote_connection: None
+		# Simple register accesses can be done on the config space directly rather than spawning `setpci`
+		if (ops := _parse_setpci_ops(cap)) is not None:
+			try:
+				return _pci_config_access(PCI_DEVS_PATH / target / 'config', ops)
+			except LookupError as e:
+				log.debug('Get capability failed: %s', e)
+				return None
+			except _PartialConfigAccess as e:
+				log.error('%s', e)
+				return None
+			except (OSError, ValueError) as e:
+				log.debug('Direct config space access failed, falling back to setpci: %s', e)
 
-	def _get_capability_local(self, cap: str, port: bool) -> str | None:
-		target = self.port if port else self.slot
-		cmd = ['setpci', '-s', target, cap]
-		log.debug(f'Running \'{" ".join(cmd)}\'')
+		cmd = ['setpci', '-s', target, *cap.split()]
+		if log.root.isEnabledFor(log.DEBUG):
+			log.debug('Running \'%s\'', ' '.join(cmd))
 		res = run(cmd, stdout = PIPE, stderr = PIPE)
 		if res.returncode == 0:
 			return res.stdout.decode()
-		log.debug(f'Get capability failed: {res.stderr.decode()}')
+		log.debug('Get capability failed: %s', res.stderr.decode())
 		return None
 
-	def _max_speed_local(self) -> str:
-		with self._max_ls.open('r') as f:
-			return f.readline().strip()
+	@staticmethod
+	def _read_sysfs(path: str) -> str | None:
+		# NOTE(aki): Not every device has every attribute, e.g. no `max_link_speed` for non-PCIe devices
+		try:
+			with open(path, 'r') as f:
+				return f.readline().strip()
+		except OSError:
+			return None
+
+	def _impl_max_speed(self) -> str:
+		if (speed := self._read_sysfs(self._max_ls)) is not None:
+			return speed
+		return 'Unknown'
 
-	def _max_width_local(self) -> str:
-		with self._max_lw.open('r') as f:
-			return f.readline().strip()
+	def _impl_max_width(self) -> str:
+		if (width := self._read_sysfs(self._max_lw)) is not None:
+			return width
+		return 'Unknown'
 
-	def _recycle_local(self) -> bool:
+	def _impl_recycle(self) -> bool:
 		log.info('Removing this device')
-		with self._remove.open('w') as f:
+		with open(self._remove, 'w') as f:
 			f.write('1')
 
 		log.info('Re-scanning bus...')
-		with SYS_PCI_RESCAN.open('w') as f:
+		with open(_SYS_PCI_RESCAN_STR, 'w') as f:
 			f.write('1')
 
 		log.info('Checking to ensure we\'re a valid device again')
-		if not self.node.exists():
+		if not os.path.exists(self._node_str):
 			log.error('Device didn\'t come back!')
 			return False
 
 		log.info('Looks like we\'re back, happy days')
 		return True
 
-	def _reset_local(self) -> None:
-		with self._reset.open('w') as f:
+	def _impl_reset(self) -> None:
+		with open(self._reset, 'w') as f:
 			f.write('1')
 
-	def _repr_local(self) -> str:
+	def __repr__(self) -> str:
 		return f'<PCIDevice slot={self.slot} port={self.port} vendor={self.vendor} device={self.device}>'
 
-	def _readlink_local(self, path: Path) -> Path:
-		return path.readlink()
+	def _impl_readlink(self, path: str) -> str:
+		return os.readlink(path)
 
-	def _populate_paths(self) -> None:
+	def _populate_paths(self, link: str | None = None) -> None:
 		''' Setup the various device node paths we need '''
 
-		self._remove = self.node / 'remove'
-		self._reset  = self.node / 'reset'
-		self._max_ls = self.node / 'max_link_speed'
-		self._max_lw = self.node / 'max_link_width'
-		self.port    = self._impl_readlink(self.node).parent.name
-
-	def _setup_shims(self) -> None:
-		''' Set up the internal shim calls used to dispatch to remote or local '''
-
-		if self._remote_connection is None:
-			# Local Shims
-			self._impl_get_capability = self._get_capability_local
-			self._impl_max_speed      = self._max_speed_local
-			self._impl_max_width      = self._max_width_local
-			self._impl_recycle        = self._recycle_local
-			self._impl_reset          = self._reset_local
-			self._impl_repr           = self._repr_local
-			self._impl_readlink       = self._readlink_local
-		else:
-			# Remote Shims
-			self._impl_get_capability = self._get_capability_remote
-			self._impl_max_speed      = self._max_speed_remote
-			self._impl_max_width      = self._max_width_remote
-			self._impl_recycle        = self._recycle_remote
-			self._impl_reset          = self._reset_remote
-			self._impl_repr           = self._repr_remote
-			self._impl_readlink       = self._readlink_remote
+		if link is None:
+			link = self._impl_readlink(self._node_str)
 
+		# NOTE(aki): These are only ever used to open files or build shell commands, so keep them as strings
+		node = self._node_str
+		self._remove = f'{node}/remove'
+		self._reset  = f'{node}/reset'
+		self._max_ls = f'{node}/max_link_speed'
+		self._max_lw = f'{node}/max_link_width'
+		# The node links to `../../../devices/<port>/<slot>`, we just want the port
+		self.port    = link.rsplit('/', 2)[-2]
+
+	@property
 	def _use_port(self) -> bool | None:
 		''' In some cases we need to address the port, not the device '''
 
-		cap = self.get_capability('CAP_EXP+02.W')
+		if (use_port := self._cache_use_port) is _MISSING:
+			use_port = self._cache_use_port = self._check_use_port(self._read_register('CAP_EXP+02.W'))
+		return use_port
+
+	@staticmethod
+	def _check_use_port(cap: int | None) -> bool | None:
+		''' Check the device/port type from the PCI Express Capabilities register to see if we need to address the port '''
+
 		if cap is None:
 			return None
 
 		# Get the port type
-		pt = (int(cap, base = 16) & 0xF0 >> 4)
+		pt = (cap & 0xF0) >> 4
 
 		# If it's a PCIe Endpoint, PCI Endpoint, or Upstream Port of a PCIe switch, then yes
 		if pt in (0, 1, 5):
@@ -457,49 +644,85 @@ class PCIDevice:
 	def _clear_cached_props(self) -> None:
 		''' Flush cached properties '''
 
-		try:
-			del self.link_status
-			del self.link_capabilities
-			del self.max_speed
-			del self.max_width
-			del self.link_speed
-			del self.link_width
-		except Exception:
-			pass
-
-	def _get_link_status(self) -> LinkStatus | None:
-		''' Extract the Link Status register '''
-
-		use_port = self._use_port()
-		if use_port is None:
-			return None
+		self._cache_use_port          = _MISSING
+		self._cache_link_status       = _MISSING
+		self._cache_link_capabilities = _MISSING
+		self._cache_max_speed         = _MISSING
+		self._cache_max_width         = _MISSING
+		self._cache_link_speed        = _MISSING
+		self._cache_link_width        = _MISSING
+
+	def _read_link_registers(self) -> None:
+		''' Read the Link Capabilities 1 and Link Status registers together, along with the port type if needed '''
+
+		# NOTE(aki): If it turns out we address the device itself, then all three registers are
+		#            on the device and we can get them all in one go, otherwise we need a second
+		#            read from the port.
+		if self._cache_use_port is _MISSING:
+			self._seed_link_registers(self._read_registers(_LINK_REGISTERS))
+
+		if self._cache_link_status is _MISSING:
+			if (use_port := self._cache_use_port) is None:
+				self._set_link_registers(None, None)
+			else:
+				self._set_link_registers(*self._read_registers(_LINK_REGISTERS[1:], use_port))
+
+	def _seed_link_registers(
+		self, dev_regs: tuple[int | None, ...], port_regs: tuple[int | None, ...] | None = None
+	) -> None:
+		'''
+		Fill in the port type, and the link registers if we can, from already read ``_LINK_REGISTERS``
+		values for this device and optionally its port.
 
-		if (link_status := self.get_capability('CAP_EXP+12.W', use_port)) is not None:
-			return LinkStatus(int(link_status, base = 16))
-		return None
+		If the port needs to be addressed and its values weren't given, the link registers are left
+		to be read from it when needed.
+		'''
 
-	def _get_link_capabilities(self) -> LinkCapabilities | None:
-		''' Extract the Link Capabilities 1 register '''
+		dev_cap, link_cap, link_status = dev_regs
+		use_port = self._cache_use_port = self._check_use_port(dev_cap)
 
-		use_port = self._use_port()
 		if use_port is None:
-			return None
+			self._set_link_registers(None, None)
+		elif not use_port:
+			self._set_link_registers(link_cap, link_status)
+		elif port_regs is not None:
+			self._set_link_registers(*port_regs[1:])
 
-		if (link_cap := self.get_capability('CAP_EXP+0c.L', use_port)) is not None:
-			return LinkCapabilities(int(link_cap, base = 16))
-		return None
+	def _set_link_registers(self, link_cap: int | None, link_status: int | None) -> None:
+		self._cache_link_capabilities = None if link_cap is None else LinkCapabilities(link_cap)
+		self._cache_link_status       = None if link_status is None else LinkStatus(link_status)
+
+	def _read_max_link(self) -> None:
+		''' Fill in both the maximum link speed and width, only falling back to sysfs if the capabilities are unreadable '''
+
+		if (lc := self.link_capabilities) is not None:
+			self._cache_max_speed = lc.speed()
+			self._cache_max_width = lc.width()
+		else:
+			self._cache_max_speed = LinkSpeed.from_str(self._impl_max_speed())
+			self._cache_max_width = LinkWidth.from_str(self._impl_max_width())
+
+	def _read_registers(self, regs: tuple[str, ...], port: bool = False) -> tuple[int | None, ...]:
+		''' Read multiple ``<reg>.<B|W|L>`` registers in one go, checking each result is a value of the right width '''
 
-	def _post_setup(self) -> None:
+		return _parse_registers(regs, self.get_capability(' '.join(regs), port))
+
+	def _read_register(self, reg: str, port: bool = False) -> int | None:
+		''' Read a single ``<reg>.<B|W|L>`` register, checking the result is a value of the right width '''
+
+		return self._read_registers((reg,), port)[0]
+
+	def _post_setup(self, link: str | None = None) -> None:
 		''' This must be done **after** construction due to how we wiggle things '''
-		self._setup_shims()
-		self._populate_paths()
+		self._populate_paths(link)
 
 	def __init__(self, slot: str, vendor: int | str, device: int | str):
-		self._remote_connection = None
 		self.slot = slot
 		self.node = PCI_DEVS_PATH / slot
+		self._node_str = str(self.node)
 		self.vendor = vendor
 		self.device = device
+		self._clear_cached_props()
 
 	def set_speed(self, speed: LinkSpeed) -> bool:
 		'''
@@ -521,44 +744,40 @@ class PCIDevice:
 			True if speed was able to be set and `get_speed` reads it back, otherwise False
 		'''
 
-		use_port = self._use_port()
+		use_port = self._use_port
 		if use_port is None:
 			return False
 
-		if (link_control2 := self.get_capability('CAP_EXP+30.W')) is not None:
-			log.info(f'Setting link speed to {speed}')
-
-			if speed > self.max_speed:
-				log.warning(f'Requested link speed of {speed} is faster than maximum speed {self.max_speed}, clamping.')
-				speed = self.max_speed
-
-			lc2 = int(link_control2, base = 16)
-
-			# BUG(aki): So, /technically/ we should check the Link Capabilities 2 Register
-			#           and then match `speed` to if the bit in the speed vector is set, if
-			#           so, then we can set this to the number of that bit.
-			#
-			#           HOWEVER, all the speeds are in-order (2.5/5/8/16/32/64), so rather than
-			#           2 bugs here, we only really have one, but the check above if the speed we
-			#           are setting is over the max link speed and then clamping means we *really*
-			#           0 bugs:tm: but only in a really roundabout way.
-			#
-			#           However #2, we still have one potential bug, and that is relying that the
-			#           int casting of LinkSpeed will always result in the proper value, I mean it
-			#           **should** but it would be better to be 100% sure.
-
-			# Mask of the existing values for the register and
-			lc2 = (lc2 & 0xFFF0) | int(speed)
-
-			# Set the new value
-			self.get_capability(f'CAP_EXP+30.W={lc2:04x}', use_port)
-
-			# We set a new speed, so we need to kick of link training to make sure it takes
-			return self.retrain_link()
-		else:
-			log.warning('Unable to re-train link, can\'t access Link Control 2 Register')
+		log.info('Setting link speed to %s', speed)
+
+		if speed > self.max_speed:
+			log.warning('Requested link speed of %s is faster than maximum speed %s, clamping.', speed, self.max_speed)
+			speed = self.max_speed
+
+		# BUG(aki): So, /technically/ we should check the Link Capabilities 2 Register
+		#           and then match `speed` to if the bit in the speed vector is set, if
+		#           so, then we can set this to the number of that bit.
+		#
+		#           HOWEVER, all the speeds are in-order (2.5/5/8/16/32/64), so rather than
+		#           2 bugs here, we only really have one, but the check above if the speed we
+		#           are setting is over the max link speed and then clamping means we *really*
+		#           0 bugs:tm: but only in a really roundabout way.
+		#
+		#           However #2, we still have one potential bug, and that is relying that the
+		#           int casting of LinkSpeed will always result in the proper value, I mean it
+		#           **should** but it would be better to be 100% sure.
+
+		# NOTE(aki): `setpci` does masked writes as a read-modify-write for us, and runs each
+		#            operation in order, so we can set the target link speed in the LC2 register
+		#            and then kick off link training to make sure it takes all in one go.
+		if self.get_capability(f'CAP_EXP+30.W={int(speed):04x}:000f CAP_EXP+10.W=0020:0020', use_port) is None:
+			log.warning('Unable to set link speed, can\'t access Link Control Registers')
 			return False
 
+		# We did link re-training so things are different now, maybe
+		self._clear_cached_props()
+		return True
+
 	def get_capability(self, cap: str, port: bool = False) -> str | None:
 		'''
 		Use `setpci` to read a PCI device register and return the value.
@@ -566,7 +785,8 @@ class PCIDevice:
 		Parameters
 		----------
 		cap : str
-			The `setpci` capability/register to read.
+			The `setpci` capability/register to read. Multiple whitespace separated operations
+			may be given, they are all done in order in a single `setpci` call.
 
 		port : bool
 			If this capability request is direct at the port, rather than the slot. (default: False)
@@ -579,80 +799,85 @@ class PCIDevice:
 			Otherwise None
 		'''
 
-		log.debug(f'Getting device capability \'{cap}\' (targeting port? {port})')
+		log.debug('Getting device capability \'%s\' (targeting port? %s)', cap, port)
 		return self._impl_get_capability(cap, port)
 
 	def retrain_link(self) -> bool:
 		''' Try to force the device to re-train the link '''
 
-		use_port = self._use_port()
+		use_port = self._use_port
 		if use_port is None:
 			return False
 
 		# FIXME(aki): This, like much of the other register access is just hacked together
 		#             It should really be fixed when we get proper register definitions written.
 
-		if (link_control := self.get_capability('CAP_EXP+10.W')) is not None:
-			log.info('Attempting to force link re-training...')
-
-			lc = int(link_control, base = 16)
+		log.info('Attempting to force link re-training...')
 
-			# Set the `Retrain Link` bit (#5)
-			lc |= 0x20
-
-			# Write the new value back to the register
-			self.get_capability(f'CAP_EXP+10.W={lc:04x}', use_port)
-
-			# We did link re-training so things are different now, maybe
-			self._clear_cached_props()
-		else:
+		# Set the `Retrain Link` bit (#5), leaving the rest of the register alone
+		if self.get_capability('CAP_EXP+10.W=0020:0020', use_port) is None:
 			log.warning('Unable to re-train link, can\'t access Link Control Register')
 			return False
+
+		# We did link re-training so things are different now, maybe
+		self._clear_cached_props()
 		return True
 
-	@cached_property
+	@property
 	def link_status(self) -> LinkStatus | None:
 		''' Get the link status '''
 
-		return self._get_link_status()
+		if self._cache_link_status is _MISSING:
+			self._read_link_registers()
+		return self._cache_link_status
 
-	@cached_property
+	@property
 	def link_capabilities(self) -> LinkCapabilities | None:
 		''' Get the link capabilities '''
 
-		return self._get_link_capabilities()
+		if self._cache_link_capabilities is _MISSING:
+			self._read_link_registers()
+		return self._cache_link_capabilities
 
-	@cached_property
+	@property
 	def max_speed(self) -> LinkSpeed:
 		''' Get the maximum link speed this PCIe device supports. '''
 
-		if (lc := self.link_capabilities) is not None:
-			return lc.speed()
-		return LinkSpeed.from_str(self._impl_max_speed())
+		if self._cache_max_speed is _MISSING:
+			self._read_max_link()
+		return self._cache_max_speed
 
-	@cached_property
+	@property
 	def max_width(self) -> LinkWidth:
 		''' Get the maximum link width this PCIe device supports. '''
 
-		if (lc := self.link_capabilities) is not None:
-			return lc.width()
-		return LinkWidth.from_str(self._impl_max_width())
+		if self._cache_max_width is _MISSING:
+			self._read_max_link()
+		return self._cache_max_width
 
-	@cached_property
+	@property
 	def link_speed(self) -> LinkSpeed:
 		''' Speed of the currently active PCIe link for this device. '''
 
-		if (ls := self.link_status) is not None:
-			return ls.speed()
-		return LinkSpeed.UNKNOWN
+		if (value := self._cache_link_speed) is _MISSING:
+			if (ls := self.link_status) is not None:
+				value = ls.speed()
+			else:
+				value = LinkSpeed.UNKNOWN
+			self._cache_link_speed = value
+		return value
 
-	@cached_property
+	@property
 	def link_width(self) -> LinkWidth:
 		''' Width of the currently active PCIe link for this device. '''
 
-		if (ls := self.link_status) is not None:
-			return ls.width()
-		return LinkWidth.UNKNOWN
+		if (value := self._cache_link_width) is _MISSING:
+			if (ls := self.link_status) is not None:
+				value = ls.width()
+			else:
+				value = LinkWidth.UNKNOWN
+			self._cache_link_width = value
+		return value
 
 	def recycle(self) -> bool:
 		'''
@@ -675,5 +900,7 @@ class PCIDevice:
 		self._impl_reset()
 		self._clear_cached_props()
 
-	def __repr__(self) -> str:
-		return self._impl_repr()
+# Public names and the submodule that provides them, they are only imported on first access
+__getattr__ = lazy_imports(globals(), {
+	'RemoteConnection': '.sys_dev_remote',
+} if HAS_FABRIC else {})
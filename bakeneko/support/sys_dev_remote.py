@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+'''
+Remote (over SSH) support for :py:class:`bakeneko.support.sys_dev.PCIDevice`.
+
+This is kept apart from :py:mod:`bakeneko.support.sys_dev` so that fabric is only imported
+when remote devices are actually used.
+'''
+
+import logging as log
+
+from fabric    import Config, Connection
+
+from .sys_dev  import PCIDevice, _SYS_PCI_RESCAN_STR, _parse_uevent
+
+__all__ = (
+	'RemoteConnection',
+)
+
+class RemoteConnection(Connection):
+	'''
+	A :py:class:`fabric.Connection` tuned for the large number of short commands that
+	remote :py:class:`PCIDevice` operations issue.
+
+	It does not wire up stdin for each command, as none of them are interactive, and
+	once connected it keeps the SSH transport alive so it can be shared for the lifetime
+	of a session rather than being re-established.
+
+	Attributes
+	----------
+	KEEPALIVE_INTERVAL : int
+		The interval in seconds between SSH keepalive packets. (default: 30)
+	'''
+
+	KEEPALIVE_INTERVAL = 30
+
+	def __init__(self, *args, **kwargs) -> None:
+		kwargs.setdefault('config', Config(overrides = {'run': {'in_stream': False}}))
+		super().__init__(*args, **kwargs)
+
+	def open(self):
+		res = super().open()
+		if self.transport is not None:
+			self.transport.set_keepalive(self.KEEPALIVE_INTERVAL)
+		return res
+
+class _RemotePCIDevice(PCIDevice):
+	'''
+	A :py:class:`PCIDevice` on a remote system, all access to it is done over the given SSH connection.
+	'''
+
+	__slots__ = ('_remote_connection', '_max_link')
+
+	@staticmethod
+	def from_uevent(
+		uevent: str, conn: Connection, link: str | None = None, max_link: tuple[str, str] | None = None
+	) -> '_RemotePCIDevice':
+		'''
+		Construct a device from the contents of its remote ``uevent`` file and optionally its node link,
+		and the already read contents of its ``max_link_speed`` and ``max_link_width`` files.
+		'''
+
+		info = _parse_uevent(uevent)
+
+		vendor, device = info['PCI_ID'].split(':')
+		slot = info['PCI_SLOT_NAME']
+
+		dev = _RemotePCIDevice(slot, vendor, device, conn)
+		dev._max_link = max_link
+		dev._post_setup(link)
+		return dev
+
+	def __init__(self, slot: str, vendor: int | str, device: int | str, conn: Connection) -> None:
+		super().__init__(slot, vendor, device)
+		self._remote_connection = conn
+		self._max_link: tuple[str, str] | None = None
+
+	def _remote_run(self, cmd: str, warn: bool = True, hide: bool = True):
+		log.debug(' ==> \'%s\'', cmd)
+		res = self._remote_connection.run(cmd, warn = warn, hide = hide)
+		log.debug(' <== %s', res)
+
+		return res
+
+	def _remote_read(self, path: str) -> str | None:
+		# NOTE(aki): The SFTP session is opened once and kept by the connection, so this doesn't
+		#            need to spin up a remote shell to `cat` the file.
+		try:
+			with self._remote_connection.sftp().open(path, 'r') as f:
+				return f.read().decode().strip()
+		except OSError:
+			return None
+
+	def _impl_get_capability(self, cap: str, port: bool) -> str | None:
+		target = self.port if port else self.slot
+		res = self._remote_run(f'setpci -s {target} {cap}')
+		if res.ok:
+			return res.stdout.strip()
+		log.debug('Get capability failed: %s', res.stderr.strip())
+		return None
+
+	# NOTE(aki): The maximum link speed and width are fixed, so if they were read up front when
+	#            enumerating, use those rather than going back to the remote for them.
+	def _impl_max_speed(self) -> str:
+		if self._max_link is not None:
+			return self._max_link[0] or 'Unknown'
+		if (speed := self._remote_read(self._max_ls)) is not None:
+			return speed
+		return 'Unknown'
+
+	def _impl_max_width(self) -> str:
+		if self._max_link is not None:
+			return self._max_link[1] or 'Unknown'
+		if (width := self._remote_read(self._max_lw)) is not None:
+			return width
+		return 'Unknown'
+
+	def _impl_recycle(self) -> bool:
+		log.info('Removing this device and re-scanning bus...')
+
+		# NOTE(aki): Each step depends on the last and they are all quick, so rather than
+		#            paying a round-trip for each do the whole thing in one go.
+		res = self._remote_run(
+			f'echo 1 > {self._remove} && echo 1 > {_SYS_PCI_RESCAN_STR} && [ -e {self._node_str} ]'
+		)
+
+		if not res.ok:
+			log.error('Device didn\'t come back!')
+			return False
+		log.info('Looks like we\'re back, happy days')
+		return True
+
+	def _impl_reset(self) -> None:
+		self._remote_run(f'echo 1 > {self._reset}')
+
+	def __repr__(self) -> str:
+		return (
+			'<PCIDevice[Remote] '
+			f'slot={self.slot} port={self.port} vendor={self.vendor} device={self.device} '
+			f'host={self._remote_connection.host}'
+			'>'
+		)
+
+	def _impl_readlink(self, path: str) -> str:
+		res = self._remote_run(f'readlink {path}')
+		if not res.ok:
+			return path
+		return res.stdout.strip()
@@ -4,17 +4,21 @@
 Helpers and utilities for various Bakeneko tests
 '''
 
-from inspect  import isfunction
-from os       import getenv
-from platform import system
-from pathlib  import Path
-from typing   import Any, cast
-from unittest import TestCase, skip
-from io       import IOBase
+from atexit          import register as atexit_register
+from collections.abc import Iterable
+from functools       import cache
+from inspect         import isfunction
+from os              import getenv
+from platform        import system
+from pathlib         import Path
+from typing          import Any, Callable, ClassVar
+from unittest        import TestCase, skip
+from io              import IOBase, StringIO
 
 # Remote Test control
 try:
-	from fabric import Connection
+	from fabric   import Connection
+	from .sys_dev import RemoteConnection
 	HAS_FABRIC = True
 except ImportError:
 	HAS_FABRIC = False
@@ -28,15 +32,56 @@ except ImportError:
 
 from torii.test import ToriiTestCase
 
-IN_CI       = getenv('GITHUB_WORKSPACE') is not None
-SKIP_REMOTE = getenv('BAKENEKO_SKIP_TESTS_REMOTE') is not None
-SKIP_SERIAL = getenv('BAKENEKO_SKIP_TESTS_SERIAL') is not None
-IS_LINUX    = system() == 'Linux'
-
-# Only allow remote tests if we have fabric, are not in CI, on Linux, and not explicitly skipping them
-ALLOW_REMOTE_TESTS = all((HAS_FABRIC, IS_LINUX, not IN_CI, not SKIP_REMOTE))
-# Only allow serial tests if we have pyserial, are not in CI, on linux, and not explicitly skipping them
-ALLOW_SERIAL_TESTS = all((HAS_PYSERIAL, IS_LINUX, not IN_CI, not SKIP_SERIAL))
+# NOTE(aki): The environment checks below are only done the first time they are needed, that way just
+#            importing this module (e.g. during test discovery) doesn't pay for them.
+
+@cache
+def _in_ci() -> bool:
+	return getenv('GITHUB_WORKSPACE') is not None
+
+@cache
+def _skip_remote() -> bool:
+	return getenv('BAKENEKO_SKIP_TESTS_REMOTE') is not None
+
+@cache
+def _skip_serial() -> bool:
+	return getenv('BAKENEKO_SKIP_TESTS_SERIAL') is not None
+
+@cache
+def _is_linux() -> bool:
+	return system() == 'Linux'
+
+@cache
+def _remote_skip_reason() -> str | None:
+	# Only allow remote tests if we have fabric, are on Linux, not in CI, not explicitly skipping them, and have a host
+	if not HAS_FABRIC:
+		return 'Remote tests disabled, fabric is not installed'
+	if not _is_linux():
+		return 'Remote tests disabled, not running on Linux'
+	if _in_ci():
+		return 'Remote tests disabled, running in CI'
+	if _skip_remote():
+		return 'Remote tests disabled, BAKENEKO_SKIP_TESTS_REMOTE is set'
+	if getenv('BAKENEKO_REMOTE_TEST_HOST') is None:
+		return 'Remote tests disabled, BAKENEKO_REMOTE_TEST_HOST is not set'
+	return None
+
+def _allow_remote_tests() -> bool:
+	return _remote_skip_reason() is None
+
+@cache
+def _allow_serial_tests() -> bool:
+	# Only allow serial tests if we have pyserial, are not in CI, on linux, and not explicitly skipping them
+	return HAS_PYSERIAL and _is_linux() and not _in_ci() and not _skip_serial()
+
+# The skip decorators applied to every remote/serial test, if those tests are disabled
+@cache
+def _remote_skip() -> Callable[[Callable[..., Any]], Callable[..., Any]] | None:
+	return None if (reason := _remote_skip_reason()) is None else skip(reason)
+
+@cache
+def _serial_skip() -> Callable[[Callable[..., Any]], Callable[..., Any]] | None:
+	return None if _allow_serial_tests() else skip('Serial tests disabled')
 
 __all__ = (
 	'BakenekoRemoteTestCase',
@@ -44,7 +89,25 @@ __all__ = (
 	'PCIeGatewareTestCase'
 )
 
-class BakenekoRemoteTestMeta(type):
+class _SkipTestMeta(type):
+	'''
+	Common base for the test metaclasses, wraps every ``test_`` function in the class namespace
+	with the decorator returned by ``_get_skip`` if there is one.
+	'''
+
+	_get_skip: Callable[[], Callable[[Callable[..., Any]], Callable[..., Any]] | None] = staticmethod(lambda: None)
+
+	def __new__(
+		cls: type['_SkipTestMeta'], name: str, bases: tuple[type, ...], namespace: dict[str, Any]
+	) -> '_SkipTestMeta':
+		for attr, val in namespace.items():
+			if attr.startswith('test_') and isfunction(val):
+				if (deco := cls._get_skip()) is None:
+					break
+				namespace[attr] = deco(val)
+		return super().__new__(cls, name, bases, namespace)
+
+class BakenekoRemoteTestMeta(_SkipTestMeta):
 	'''
 	This metaclass is used to automatically annotate all tests within a :py:class:`BakenekoRemotelTest`
 	test class with :py:meth:`unitest.skip` if we don't have remote test support capabilities.
@@ -53,22 +116,16 @@ class BakenekoRemoteTestMeta(type):
 		* We are not running in CI. (checks the existence of the ``GITHUB_WORKSPACE`` env var)
 		* We can import :py:mod:`fabric` for talking to the remote host.
 		* The ``BAKENEKO_SKIP_TESTS_REMOTE`` environment variable is not set.
+		* The ``BAKENEKO_REMOTE_TEST_HOST`` environment variable is set.
 		* We are running on Linux.
 
 	If any of the above checks fail, all remote tests are disabled.
 
 	'''
 
-	def __new__(
-		cls: type[type], name: str, bases: tuple[type, ...], namespace: dict[str, Any]
-	) -> 'BakenekoRemoteTestMeta':
-		for attr, val in namespace.items():
-			if isfunction(val):
-				if not ALLOW_REMOTE_TESTS and val.__name__.startswith('test_'):
-					namespace[attr] = skip('Remote tests disabled')(val)
-		return cast(BakenekoRemoteTestMeta, type.__new__(cls, name, bases, namespace))
+	_get_skip = staticmethod(_remote_skip)
 
-class BakenekoSerialTestMeta(type):
+class BakenekoSerialTestMeta(_SkipTestMeta):
 	'''
 	Like the :py:class:`BakenekoRemoteTestMeta` metaclass, this is used to automatically annotate all
 	tests within a :py:class:`BakenekoSerialTest` test class with :py:meth:`unitest.skip` if we don't
@@ -84,14 +141,7 @@ class BakenekoSerialTestMeta(type):
 
 	'''
 
-	def __new__(
-		cls: type[type], name: str, bases: tuple[type, ...], namespace: dict[str, Any]
-	) -> 'BakenekoSerialTestMeta':
-		for attr, val in namespace.items():
-			if isfunction(val):
-				if not ALLOW_REMOTE_TESTS and val.__name__.startswith('test_'):
-					namespace[attr] = skip('Serial tests disabled')(val)
-		return cast(BakenekoSerialTestMeta, type.__new__(cls, name, bases, namespace))
+	_get_skip = staticmethod(_serial_skip)
 
 class BakenekoRemoteTestCase(TestCase, metaclass = BakenekoRemoteTestMeta):
 	'''
@@ -116,9 +166,12 @@ class BakenekoRemoteTestCase(TestCase, metaclass = BakenekoRemoteTestMeta):
 
 	LONG_LIVED : bool
 		If the remote connection is long-lived. If set to true, the connection will be
-		established on construction of the test class and live for every single test case
+		established once when the test class is set up and live for every single test case
 		run. Otherwise, the connection is established prior to each ``test_`` case and
 		torn down after. (default: True)
+
+		Long-lived connections are shared between all test cases that connect to the same
+		host, as the same user, with the same key, and are closed when the interpreter exits.
 	'''
 
 	REMOTE_HOST = getenv('BAKENEKO_REMOTE_TEST_HOST')
@@ -129,26 +182,47 @@ class BakenekoRemoteTestCase(TestCase, metaclass = BakenekoRemoteTestMeta):
 
 	_remote_connection: 'Connection | None' = None
 
+	# Long-lived connections, keyed on (host, user, key), so we only pay for the SSH handshake once
+	_connection_pool: ClassVar[dict[tuple[str | None, str | None, str | None], 'Connection']] = {}
+
+	@classmethod
+	def _new_connection(cls) -> 'Connection':
+		''' Construct a new Fabric SSH connection '''
+
+		# NOTE(aki):
+		# The `type: ignore` is due to the type checking not being able to see that if we
+		# do end up getting called then `RemoteConnection` is not unbound.
+		return RemoteConnection( # type: ignore
+			cls.REMOTE_HOST, cls.REMOTE_USER,
+			connect_kwargs = {
+				'key_filename': cls.REMOTE_KEY
+			}
+		)
+
+	@classmethod
+	def _pooled_connection(cls) -> 'Connection':
+		''' Get the long-lived Fabric SSH connection for this host/user/key, constructing it if needed '''
+
+		key = (cls.REMOTE_HOST, cls.REMOTE_USER, cls.REMOTE_KEY)
+		if (conn := cls._connection_pool.get(key)) is None:
+			conn = cls._connection_pool[key] = cls._new_connection()
+		return conn
+
 	def _setup_connection(self) -> bool:
 		''' Setup the Fabric SSH connection '''
 
-		if ALLOW_REMOTE_TESTS:
-			# NOTE(aki):
-			# The `type: ignore` is due to the type checking not being able to see that if we
-			# do end up in this branch of the if then `Connection` is not unbound.
-			self._remote_connection = Connection( # type: ignore
-				self.REMOTE_HOST, self.REMOTE_USER,
-				connect_kwargs = {
-					'key_filename': self.REMOTE_KEY
-				}
-			)
+		if _allow_remote_tests():
+			if self.LONG_LIVED:
+				self._remote_connection = self._pooled_connection()
+			else:
+				self._remote_connection = self._new_connection()
 			return True
 		return False
 
 	def _close_connection(self) -> bool:
 		''' Close the Fabric SSH connection '''
 
-		if ALLOW_REMOTE_TESTS and self._remote_connection is not None:
+		if _allow_remote_tests() and self._remote_connection is not None:
 			self._remote_connection.close()
 			return True
 		return False
@@ -215,18 +289,73 @@ class BakenekoRemoteTestCase(TestCase, metaclass = BakenekoRemoteTestMeta):
 				raise self.failureException(e)
 		return None
 
+	def remote_run_batch(self, cmds: Iterable[str], **kwargs) -> list[str] | None:
+		'''
+		Run multiple commands on the remote system in a single remote shell.
+
+		Each command's output is framed with an ASCII record separator and followed by its exit
+		status, so they can be split back out, saving a round-trip per command over
+		:py:meth:`remote_run_cmd`.
+
+		Parameters
+		----------
+		cmds : Iterable[str]
+			The commands to run on the remote system, in order.
+
+		Returns
+		-------
+		list[str]
+			If the connection is active and valid, the stdout of each command.
+		None
+			If there is no remote connection.
+
+		Raises
+		------
+		AssertionError
+			If the `run` on the remote connection fails for any reason, or any of the
+			commands exit non-zero.
+		'''
+
+		cmds = list(cmds)
+		# NOTE(aki): The exit status of the shell is only that of the last thing it ran, so each
+		#            command's own status is emitted after its output, behind a unit separator.
+		script = ''.join(f'printf \'\\036\'; {cmd}\nprintf \'\\037%d\' "$?"\n' for cmd in cmds)
+		res = self.remote_run_cmd('sh -s', in_stream = StringIO(script), **kwargs)
+		if res is None:
+			return None
+
+		outputs: list[str] = []
+		for cmd, frame in zip(cmds, res.stdout.split('\x1e')[1:]):
+			output, sep, status = frame.rpartition('\x1f')
+			if not sep:
+				raise self.failureException(f'Remote command \'{cmd}\' exited the remote shell')
+			if status != '0':
+				raise self.failureException(f'Remote command \'{cmd}\' exited with status {status}')
+			outputs.append(output)
+
+		# If a command took the whole shell down with it, the rest never ran
+		if len(outputs) != len(cmds):
+			raise self.failureException(f'Remote command \'{cmds[len(outputs)]}\' did not run')
+		return outputs
+
 	def assertRemoteConnected(self):
 		''' Assert that we are connected to the remote session '''
 
+		# If the SSH transport is already up then we know we're connected, no need for a round-trip
+		if self._remote_connection is not None and self._remote_connection.is_connected:
+			return
+
 		res = self.remote_run_cmd('uname -a')
 		if res is None or not res.ok:
 			raise self.failureException('Remote connection failed')
 
-	def __init__(self, *args, **kwargs):
-		super().__init__(*args, **kwargs)
+	@classmethod
+	def setUpClass(cls) -> None:
+		super().setUpClass()
 
-		if self.LONG_LIVED:
-			self._setup_connection()
+		# NOTE(aki): This is done once per class rather than for every test case instance
+		if cls.LONG_LIVED and _allow_remote_tests():
+			cls._remote_connection = cls._pooled_connection()
 
 	def setUp(self) -> None:
 		if not self.LONG_LIVED:
@@ -236,6 +365,14 @@ class BakenekoRemoteTestCase(TestCase, metaclass = BakenekoRemoteTestMeta):
 		if not self.LONG_LIVED:
 			self._close_connection()
 
+@atexit_register
+def _close_pooled_connections() -> None:
+	''' Close all of the long-lived remote test connections '''
+
+	for conn in BakenekoRemoteTestCase._connection_pool.values():
+		conn.close()
+	BakenekoRemoteTestCase._connection_pool.clear()
+
 class BakenekoSerialTestCase(TestCase, metaclass = BakenekoSerialTestMeta):
 	'''
 	Run :py:mod:`unitest` based test cases that interact with a DUT over serial
@@ -252,6 +389,12 @@ class BakenekoSerialTestCase(TestCase, metaclass = BakenekoSerialTestMeta):
 		value from the ``BAKENEKO_SERIAL_TEST_BAUD`` environment variable if it exists.
 		(default: 115200)
 
+	SERIAL_TIMEOUT : float
+		The read timeout in seconds, so reads return promptly rather than blocking until
+		the requested number of bytes arrive. (default: 0.02)
+
+	SERIAL_WRITE_TIMEOUT : float
+		The write timeout in seconds. (default: 0.5)
 
 	LONG_LIVED : bool
 		If the serial connection is long-lived. If set to true, the connection will be
@@ -263,6 +406,9 @@ class BakenekoSerialTestCase(TestCase, metaclass = BakenekoSerialTestMeta):
 	SERIAL_PORT = getenv('BAKENEKO_SERIAL_TEST_PORT')
 	SERIAL_BAUD = int(getenv('BAKENEKO_SERIAL_TEST_BAUD', '115200'))
 
+	SERIAL_TIMEOUT       = 0.02
+	SERIAL_WRITE_TIMEOUT = 0.5
+
 	LONG_LIVED  = True
 
 	_remote_connection: 'Serial | None' = None
@@ -270,24 +416,83 @@ class BakenekoSerialTestCase(TestCase, metaclass = BakenekoSerialTestMeta):
 	def _setup_connection(self) -> bool:
 		''' Setup the serial connection '''
 
-		if ALLOW_SERIAL_TESTS:
+		if _allow_serial_tests():
 			# NOTE(aki):
 			# The `type: ignore` is due to the type checking not being able to see that if we
 			# do end up in this branch of the if then `Serial` is not unbound.
 			self._remote_connection = Serial( # type: ignore
-				port = self.SERIAL_PORT, baudrate = self.SERIAL_BAUD
+				port = self.SERIAL_PORT, baudrate = self.SERIAL_BAUD, timeout = self.SERIAL_TIMEOUT,
+				write_timeout = self.SERIAL_WRITE_TIMEOUT, exclusive = True
 			)
+			# Drop the USB-serial latency timer from the default 16ms to 1ms so small
+			# messages to/from the DUT aren't held back, this is best-effort.
+			try:
+				self._remote_connection.set_low_latency_mode(True)
+			except (AttributeError, NotImplementedError, OSError, ValueError):
+				pass
 			return True
 		return False
 
 	def _close_connection(self) -> bool:
 		''' Close the serial connection '''
 
-		if ALLOW_SERIAL_TESTS and self._remote_connection is not None:
+		if _allow_serial_tests() and self._remote_connection is not None:
 			self._remote_connection.close()
 			return True
 		return False
 
+	def serial_read_available(self, max_bytes: int = 4096) -> bytes:
+		'''
+		Read whatever is available from the DUT.
+
+		This blocks for at most the port timeout (:py:attr:`SERIAL_TIMEOUT`) for the first byte,
+		then drains whatever else is already buffered in one go, rather than waiting to fill a
+		fixed size read.
+
+		Parameters
+		----------
+		max_bytes : int
+			The maximum number of bytes to return. (default: 4096)
+
+		Returns
+		-------
+		bytes
+			The bytes read, which is empty if nothing arrived, ``max_bytes`` is less than 1, or
+			there is no serial connection.
+		'''
+
+		if (ser := self._remote_connection) is None or max_bytes < 1:
+			return b''
+
+		if not (data := ser.read(1)):
+			return b''
+
+		if (count := min(ser.in_waiting, max_bytes - 1)) > 0:
+			data += ser.read(count)
+		return data
+
+	def serial_read_until(self, delim: bytes = b'\n', max_bytes: int | None = None) -> bytes:
+		'''
+		Read from the DUT up to and including ``delim``, for framed protocols.
+
+		Parameters
+		----------
+		delim : bytes
+			The frame delimiter. (default: ``b'\\n'``)
+
+		max_bytes : int | None
+			The maximum number of bytes to read. (default: None)
+
+		Returns
+		-------
+		bytes
+			The bytes read, which is empty if there is no serial connection.
+		'''
+
+		if (ser := self._remote_connection) is None:
+			return b''
+		return ser.read_until(delim, max_bytes)
+
 	def __init__(self, methodName: str = 'runTest', **kwargs) -> None:
 		super().__init__(methodName, **kwargs)
 
@@ -12,6 +12,16 @@ try:
 	# XXX(aki): Replace with Torii resource when torii-hdl/#145 and torii-hdl/!146 are dealt with
 	from .resources                 import PCIeBusResources
 
+	# The PCIe x1 edge connector on the Versa 5G, built once so other scripts can re-use it
+	# See: Lattice FPGA-EB-02021-2.4; Figure A.4. SERDES; Pg. 26
+	# We only care about DCU0 CH0
+	VERSA5G_PCIE_RESOURCES = tuple(PCIeBusResources(
+		0,
+		perst_n = 'A6', refclk_p = 'Y11', refclk_n = 'Y12',
+		per0_p = 'Y5', per0_n = 'Y6', pet0_p = 'W4', pet0_n = 'W5',
+		refclk_freq = 200 * MHz
+	))
+
 	# TODO(aki):
 	# We likely want to switch from using the `OpenOCD` base programming that the base
 	# Versa platform uses for `bmda`, as that now supports the ECP5 in upstream.
@@ -22,14 +32,7 @@ try:
 	class BakenekoVersa5GPlatform(VersaECP55GPlatform):
 		resources = [
 			*VersaECP55GPlatform.resources,
-			# See: Lattice FPGA-EB-02021-2.4; Figure A.4. SERDES; Pg. 26
-			# We only care about DCU0 CH0
-			*PCIeBusResources(
-				0,
-				perst_n = 'A6', refclk_p = 'Y11', refclk_n = 'Y12',
-				per0_p = 'Y5', per0_n = 'Y6', pet0_p = 'W4', pet0_n = 'W5',
-				refclk_freq = 200 * MHz
-			)
+			*VERSA5G_PCIE_RESOURCES,
 		]
 
 except ImportError:
@@ -4,15 +4,19 @@
 Machinery for defining registers for the PCIe capability structures and configuration space.
 '''
 
+import re
+import struct
+
 from enum      import IntEnum, auto, unique
-from itertools import takewhile
+from functools import lru_cache
+from types     import MappingProxyType
 from typing    import Any
 
 from construct import (
 	BitsInteger, BytesInteger, Bytewise, Default,
 	Int8sb, Int8sl, Int8ub, Int8ul, Int16sb, Int16sl, Int16ub, Int16ul,
 	Int24sb, Int24sl, Int24ub, Int24ul, Int32sb, Int32sl, Int32ub, Int32ul,
-	Int64sb, Int64sl, Int64ub, Int64ul, Renamed, Struct, Subconstruct,
+	Int64sb, Int64sl, Int64ub, Int64ul, Construct, ConstructError, Renamed, Struct, Subconstruct,
 )
 
 from torii.util.tracer import get_var_name
@@ -25,6 +29,18 @@ __all__ = (
 	'ReservedField',
 )
 
+# What the compiled codec raises for bad data where the interpreted one raises a `ConstructError`, the
+# `ValueError`s are from its bit-string and integer conversions.
+_COMPILED_ERRORS = (ConstructError, IndexError, ValueError, struct.error)
+
+# Everything up to the first uppercase letter of a field name is the type prefix
+_PREFIX_RE = re.compile(r'[^A-Z]*')
+
+@lru_cache(maxsize = None)
+def _get_prefix(name: str) -> str:
+	''' Get the type prefix of a register field name, that being everything before the first uppercase letter '''
+	return _PREFIX_RE.match(name).group(0) # type: ignore
+
 @unique
 class RegisterType(IntEnum):
 	''' Describes the type of the PCIe register/field and how it behaves. '''
@@ -194,7 +210,8 @@ class RegisterField(Subconstruct):
 		The length of the field in bits.
 	'''
 
-	TYPE_PREFIXES = {
+	# NOTE(aki): These are read-only as the results of looking them up are cached
+	TYPE_PREFIXES = MappingProxyType({
 		'u8l':  Int8ul,
 		'u16l': Int16ul,
 		'u24l': Int24ul,
@@ -215,15 +232,15 @@ class RegisterField(Subconstruct):
 		's24b': Int24sb,
 		's32b': Int32sb,
 		's64b': Int64sb,
-	}
+	})
 
-	LENGTH_TYPES = {
+	LENGTH_TYPES = MappingProxyType({
 		1: Int8ul,
 		2: Int16ul,
 		3: Int24ul,
 		4: Int32ul,
 		8: Int64ul,
-	}
+	})
 
 	@classmethod
 	def _type_from_prefix(cls, field_name: str):
@@ -245,10 +262,21 @@ class RegisterField(Subconstruct):
 			The field name to extract type information from.
 		'''
 
-		def _get_prefix(name: str) -> str:
-			return ''.join(takewhile(lambda c: not c.isupper(), name))
+		return cls._type_from_prefix_str(_get_prefix(field_name))
 
-		pfx = _get_prefix(field_name)
+	@classmethod
+	@lru_cache(maxsize = None)
+	def _type_from_prefix_str(cls, pfx: str):
+		'''
+		Return appropriate :py:class:`construct.Subconstruct` for the given, already extracted, prefix.
+
+		Most fields share only a handful of prefixes, so the result is cached per prefix.
+
+		Parameters
+		----------
+		pfx : str
+			The field name prefix.
+		'''
 
 		subcon_type = cls.TYPE_PREFIXES.get(pfx, None)
 
@@ -263,6 +291,7 @@ class RegisterField(Subconstruct):
 		return subcon_type
 
 	@classmethod
+	@lru_cache(maxsize = None)
 	def _type_from_size(cls, size: int):
 		'''
 		Return appropriate :py:class:`construct.Subconstruct` for given size in bits.
@@ -279,6 +308,7 @@ class RegisterField(Subconstruct):
 		size : int
 			The size of the type to get in bits.
 
+		Register fields come in only a handful of sizes, so the result is cached per size.
 		'''
 		if size % 8 == 0:
 			bc = size // 8
@@ -359,8 +389,14 @@ class PCIOnlyField(Subconstruct):
 		return (name / subcon_type) * self.description # type: ignore
 
 
+@lru_cache(maxsize = None)
+def _reserved_field(length: int) -> RegisterField:
+	return RegisterField(RegisterType.RO, 'Reserved Field', length = length)
+
 def ReservedField(*, length: int = 1) -> Renamed:
-	return '_Reserved' / RegisterField(RegisterType.RO, 'Reserved Field', length = length)
+	# NOTE(aki): The `RegisterField` is shared between all reserved fields of the same length, the
+	#            `Renamed` wrapping it is still unique to each use.
+	return '_Reserved' / _reserved_field(length)
 
 
 class Register(Struct):
@@ -379,3 +415,58 @@ class Register(Struct):
 		self.description = description
 		self.default     = default
 		self.len         = length
+		# `False` until first used, then the compiled form, or `None` if it can't be compiled
+		self._compiled   = False
+		self._size       = 0
+
+	def __getstate__(self) -> dict[str, Any]:
+		# NOTE(aki): The compiled form is tied to this instance, so copies re-compile their own on first use
+		state = super().__getstate__()
+		state['_compiled'] = False
+		return state
+
+	def _get_compiled(self) -> Construct | None:
+		'''
+		Get the compiled form of this register, compiling it on first use.
+
+		Returns
+		-------
+		construct.Compiled
+			The compiled parser/builder for this register.
+		None
+			If the register can not be compiled, or the compiled form doesn't agree with the
+			interpreted one on a few sample values, in which case the interpreted one is used.
+		'''
+
+		if (compiled := self._compiled) is False:
+			try:
+				compiled = self.compile()
+				self._size = size = self.sizeof()
+				for sample in (bytes(size), b'\xFF' * size, bytes(i & 0xFF for i in range(1, size + 1))):
+					if compiled.parse(sample) != super().parse(sample):
+						compiled = None
+						break
+			# NOTE(aki): construct raises all sorts of things for what it can't compile or size
+			except Exception:
+				compiled = None
+			self._compiled = compiled
+		return compiled # type: ignore
+
+	# NOTE(aki): The compiled codec neither checks for short data nor raises construct's errors, so short
+	#            data goes straight to the interpreted one, and bad data is re-done by it to get the
+	#            proper `ConstructError`. Anything else is a real error and is left alone.
+	def parse(self, data: bytes, **contextkw) -> Any:
+		if (compiled := self._get_compiled()) is not None and len(data) >= self._size:
+			try:
+				return compiled.parse(data, **contextkw)
+			except _COMPILED_ERRORS:
+				pass
+		return super().parse(data, **contextkw)
+
+	def build(self, obj: Any, **contextkw) -> bytes:
+		if (compiled := self._get_compiled()) is not None:
+			try:
+				return compiled.build(obj, **contextkw)
+			except _COMPILED_ERRORS:
+				pass
+		return super().build(obj, **contextkw)
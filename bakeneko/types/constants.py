@@ -4,8 +4,10 @@
 Various constants used throughout Bakeneko.
 '''
 
-from typing import NamedTuple
-from enum   import IntEnum, auto, unique
+from collections.abc import Mapping
+from enum            import IntEnum, auto, unique
+from types           import MappingProxyType
+from typing          import NamedTuple
 
 __all__ = (
 	'LinkSpeed',
@@ -15,6 +17,8 @@ __all__ = (
 
 	'PCIeConfiguration',
 	'VALID_PCIE_CONFIGURATIONS',
+	'VALID_PCIE_CONFIGURATIONS_BY_STANDARD',
+	'VALID_WIDTHS_BY_SPEED',
 )
 
 @unique
@@ -40,43 +44,14 @@ class LinkSpeed(IntEnum):
 	''' Unknown '''
 
 	def __str__(self) -> str:
-		match self:
-			case LinkSpeed.LS2_5:
-				return '2.5 GT/s'
-			case LinkSpeed.LS5_0:
-				return '5 GT/s'
-			case LinkSpeed.LS8_0:
-				return '8 GT/s'
-			case LinkSpeed.LS16_0:
-				return '16 GT/s'
-			case LinkSpeed.LS32_0:
-				return '32 GT/s'
-			case LinkSpeed.LS64_0:
-				return '64 GT/s'
-			case LinkSpeed.LS128_0:
-				return '128 GT/s'
-			case _:
-				return 'Unknown'
+		return _LINK_SPEED_STR.get(self, 'Unknown')
 
 	@staticmethod
 	def from_str(speed: str) -> 'LinkSpeed':
-		match speed:
-			case '2.5 GT/s' | '2.5 GT/s PCIe':
-				return LinkSpeed.LS2_5
-			case '5 GT/s' | '5.0 GT/s PCIe':
-				return LinkSpeed.LS5_0
-			case '8 GT/s' | '8.0 GT/s PCIe':
-				return LinkSpeed.LS8_0
-			case '16 GT/s' | '16.0 GT/s PCIe':
-				return LinkSpeed.LS16_0
-			case '32 GT/s' | '32.0 GT/s PCIe':
-				return LinkSpeed.LS32_0
-			case '64 GT/s' | '64.0 GT/s PCIe':
-				return LinkSpeed.LS64_0
-			case '128 GT/s' | '128.0 GT/s PCIe':
-				return LinkSpeed.LS128_0
-			case _:
-				return LinkSpeed.UNKNOWN
+		if (value := _LINK_SPEED_FROM_STR.get(speed)) is not None:
+			return value
+		# Slow path, normalize any stray whitespace (e.g. a trailing newline from sysfs) and try again
+		return _LINK_SPEED_FROM_STR.get(' '.join(speed.split()), LinkSpeed.UNKNOWN)
 
 	def __float__(self) -> float:
 		match self:
@@ -97,6 +72,33 @@ class LinkSpeed(IntEnum):
 			case _:
 				raise ValueError('Unable to convert unknown link speed to float')
 
+_LINK_SPEED_STR: dict[LinkSpeed, str] = {
+	LinkSpeed.LS2_5:   '2.5 GT/s',
+	LinkSpeed.LS5_0:   '5 GT/s',
+	LinkSpeed.LS8_0:   '8 GT/s',
+	LinkSpeed.LS16_0:  '16 GT/s',
+	LinkSpeed.LS32_0:  '32 GT/s',
+	LinkSpeed.LS64_0:  '64 GT/s',
+	LinkSpeed.LS128_0: '128 GT/s',
+}
+
+# NOTE(aki): Both our own names and the ones from the Linux sysfs ``max_link_speed`` attribute
+_LINK_SPEED_FROM_STR: dict[str, LinkSpeed] = {
+	'2.5 GT/s':        LinkSpeed.LS2_5,
+	'2.5 GT/s PCIe':   LinkSpeed.LS2_5,
+	'5 GT/s':          LinkSpeed.LS5_0,
+	'5.0 GT/s PCIe':   LinkSpeed.LS5_0,
+	'8 GT/s':          LinkSpeed.LS8_0,
+	'8.0 GT/s PCIe':   LinkSpeed.LS8_0,
+	'16 GT/s':         LinkSpeed.LS16_0,
+	'16.0 GT/s PCIe':  LinkSpeed.LS16_0,
+	'32 GT/s':         LinkSpeed.LS32_0,
+	'32.0 GT/s PCIe':  LinkSpeed.LS32_0,
+	'64 GT/s':         LinkSpeed.LS64_0,
+	'64.0 GT/s PCIe':  LinkSpeed.LS64_0,
+	'128 GT/s':        LinkSpeed.LS128_0,
+	'128.0 GT/s PCIe': LinkSpeed.LS128_0,
+}
 
 @unique
 class LinkWidth(IntEnum):
@@ -121,43 +123,14 @@ class LinkWidth(IntEnum):
 	''' Unknown '''
 
 	def __str__(self) -> str:
-		match self:
-			case LinkWidth.X1:
-				return 'x1'
-			case LinkWidth.X2:
-				return 'x2'
-			case LinkWidth.X4:
-				return 'x4'
-			case LinkWidth.X8:
-				return 'x8'
-			case LinkWidth.X12:
-				return 'x12'
-			case LinkWidth.X16:
-				return 'x16'
-			case LinkWidth.X32:
-				return 'x32'
-			case _:
-				return 'Unknown'
+		return _LINK_WIDTH_STR.get(self, 'Unknown')
 
 	@staticmethod
 	def from_str(width: str) -> 'LinkWidth':
-		match width:
-			case 'x1':
-				return LinkWidth.X1
-			case 'x2':
-				return LinkWidth.X2
-			case 'x4':
-				return LinkWidth.X4
-			case 'x8':
-				return LinkWidth.X8
-			case 'x12':
-				return LinkWidth.X12
-			case 'x16':
-				return LinkWidth.X16
-			case 'x32':
-				return LinkWidth.X32
-			case _:
-				return LinkWidth.UNKNOWN
+		if (value := _LINK_WIDTH_FROM_STR.get(width)) is not None:
+			return value
+		# Slow path, strip any stray whitespace and try again
+		return _LINK_WIDTH_FROM_STR.get(width.strip(), LinkWidth.UNKNOWN)
 
 	def __int__(self) -> int:
 		match self:
@@ -178,6 +151,22 @@ class LinkWidth(IntEnum):
 			case _:
 				raise ValueError('Unable to convert unknown link speed to int')
 
+_LINK_WIDTH_STR: dict[LinkWidth, str] = {
+	LinkWidth.X1:  'x1',
+	LinkWidth.X2:  'x2',
+	LinkWidth.X4:  'x4',
+	LinkWidth.X8:  'x8',
+	LinkWidth.X12: 'x12',
+	LinkWidth.X16: 'x16',
+	LinkWidth.X32: 'x32',
+}
+
+# NOTE(aki): Both our own names and the bare lane count from the Linux sysfs ``max_link_width`` attribute
+_LINK_WIDTH_FROM_STR: dict[str, LinkWidth] = {
+	**{name: width for width, name in _LINK_WIDTH_STR.items()},
+	**{str(int(width)): width for width in _LINK_WIDTH_STR},
+}
+
 @unique
 class PCIeStandard(IntEnum):
 	''' PCIe Version '''
@@ -198,69 +187,80 @@ class PCIeStandard(IntEnum):
 	''' PCIe v7.0 '''
 
 	def __str__(self) -> str:
-		match self:
-			case PCIeStandard.PCIE_1:
-				return 'v1.1'
-			case PCIeStandard.PCIE_2:
-				return 'v2.1'
-			case PCIeStandard.PCIE_3:
-				return 'v3.0'
-			case PCIeStandard.PCIE_4:
-				return 'v4.0'
-			case PCIeStandard.PCIE_5:
-				return 'v5.0'
-			case PCIeStandard.PCIE_6:
-				return 'v6.0'
-			case PCIeStandard.PCIE_7:
-				return 'v7.0'
-			case _:
-				return 'INVALID'
+		return _PCIE_STANDARD_STR.get(self, 'INVALID')
 
+_PCIE_STANDARD_STR: dict[PCIeStandard, str] = {
+	PCIeStandard.PCIE_1: 'v1.1',
+	PCIeStandard.PCIE_2: 'v2.1',
+	PCIeStandard.PCIE_3: 'v3.0',
+	PCIeStandard.PCIE_4: 'v4.0',
+	PCIeStandard.PCIE_5: 'v5.0',
+	PCIeStandard.PCIE_6: 'v6.0',
+	PCIeStandard.PCIE_7: 'v7.0',
+}
 
 class PCIeConfiguration(NamedTuple):
 	standard: PCIeStandard
 	link_speeds: tuple[LinkSpeed, ...]
 	link_widths: tuple[LinkWidth, ...]
 
+# NOTE(aki): Most of the standards share the same set of link widths, so only build them once
+_WIDTHS_ALL: tuple[LinkWidth, ...] = (
+	LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X12, LinkWidth.X16, LinkWidth.X32,
+)
+_WIDTHS_NO_X12_X32: tuple[LinkWidth, ...] = (
+	LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X16,
+)
+
 VALID_PCIE_CONFIGURATIONS: tuple[PCIeConfiguration, ...] = (
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_1,
 		(LinkSpeed.LS2_5, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X12, LinkWidth.X16, LinkWidth.X32, )
+		_WIDTHS_ALL
 	),
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_2,
 		(LinkSpeed.LS5_0, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X12, LinkWidth.X16, LinkWidth.X32, )
+		_WIDTHS_ALL
 	),
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_3,
 		(LinkSpeed.LS8_0, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X12, LinkWidth.X16, LinkWidth.X32, )
+		_WIDTHS_ALL
 	),
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_4,
 		(LinkSpeed.LS16_0, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X12, LinkWidth.X16, LinkWidth.X32, )
+		_WIDTHS_ALL
 	),
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_5,
 		(LinkSpeed.LS32_0, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X12, LinkWidth.X16, LinkWidth.X32, )
+		_WIDTHS_ALL
 	),
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_6,
 		(LinkSpeed.LS64_0, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X16, )
+		_WIDTHS_NO_X12_X32
 	),
-	(
+	PCIeConfiguration(
 		PCIeStandard.PCIE_7,
 		(LinkSpeed.LS128_0, ),
-		(LinkWidth.X1, LinkWidth.X2, LinkWidth.X4, LinkWidth.X8, LinkWidth.X16, )
+		_WIDTHS_NO_X12_X32
 	)
 )
 ''' Valid PCIe standard, Link Speed, and Link Width combinations '''
 
+VALID_PCIE_CONFIGURATIONS_BY_STANDARD: Mapping[PCIeStandard, PCIeConfiguration] = MappingProxyType({
+	cfg.standard: cfg for cfg in VALID_PCIE_CONFIGURATIONS
+})
+''' The entries of :py:data:`VALID_PCIE_CONFIGURATIONS` indexed by PCIe standard '''
+
+VALID_WIDTHS_BY_SPEED: Mapping[LinkSpeed, frozenset[LinkWidth]] = MappingProxyType({
+	speed: frozenset(cfg.link_widths) for cfg in VALID_PCIE_CONFIGURATIONS for speed in cfg.link_speeds
+})
+''' The valid Link Widths for each Link Speed '''
+
 
 @unique
 class LinkState(IntEnum):
@@ -21,7 +21,10 @@ __all__ = (
 
 class PCIeGatewareError(Exception):
 	''' Base class for all PCIe gateware errors. '''
-	pass
+
+	# NOTE(aki): `BaseException` always provides a `__dict__`, but it's only allocated when first used, so
+	#            if the errors keep their attributes in slots it never is.
+	__slots__ = ()
 
 class PCIeUnsupportedLinkSpeed(PCIeGatewareError):
 	'''
@@ -47,13 +50,19 @@ class PCIeUnsupportedLinkSpeed(PCIeGatewareError):
 		The supported PCIe link speeds.
 	'''
 
+	# NOTE(aki): The message is only formatted when it's asked for, as these are often caught and discarded
+	_MESSAGE = 'The link speed of {} is not supported, only the following: {}.'
+
+	__slots__ = ('requested_speed', 'supported_speeds')
+
 	def __init__(self, requested: LinkSpeed, supported: Sequence[LinkSpeed]) -> None:
-		super().__init__(
-			f'The link speed of {requested} is not supported, only the following: {", ".join(map(str, supported))}.'
-		)
+		super().__init__(requested, supported)
 		self.requested_speed  = requested
 		self.supported_speeds = supported
 
+	def __str__(self) -> str:
+		return self._MESSAGE.format(self.requested_speed, ', '.join(map(str, self.supported_speeds)))
+
 class PCIeUnsupportedLinkWidth(PCIeGatewareError):
 	'''
 	Raised when the given PHY can not fit the given link width.
@@ -78,13 +87,18 @@ class PCIeUnsupportedLinkWidth(PCIeGatewareError):
 		The supported PCIe link widths.
 	'''
 
+	_MESSAGE = 'The link width of {} is not supported, only the following: {}.'
+
+	__slots__ = ('requested_width', 'supported_widths')
+
 	def __init__(self, requested: LinkWidth, supported: Sequence[LinkWidth]) -> None:
-		super().__init__(
-			f'The link width of {requested} is not supported, only the following: {", ".join(map(str, supported))}.'
-		)
+		super().__init__(requested, supported)
 		self.requested_width  = requested
 		self.supported_widths = supported
 
+	def __str__(self) -> str:
+		return self._MESSAGE.format(self.requested_width, ', '.join(map(str, self.supported_widths)))
+
 class PCIeUnsupportedConfiguration(PCIeGatewareError):
 	'''
 	Raised when an incompatible PCIe configuration is provided.
@@ -115,16 +129,22 @@ class PCIeUnsupportedConfiguration(PCIeGatewareError):
 		The PCIe link width.
 	'''
 
+	_MESSAGE = 'PCIe standard {} with link speed of {} and link width of {} is an unsupported configuration.'
+
+	__slots__ = ('pcie_standard', 'link_speed', 'link_width')
+
 	def __init__(self, std: PCIeStandard, speed: LinkSpeed, width: LinkWidth) -> None:
-		super().__init__(
-			f'PCIe standard {std} with link speed of {speed} and link width of {width} is an unsupported configuration.'
-		)
+		super().__init__(std, speed, width)
 
 		self.pcie_standard = std
 		self.link_speed    = speed
 		self.link_width    = width
 
+	def __str__(self) -> str:
+		return self._MESSAGE.format(self.pcie_standard, self.link_speed, self.link_width)
+
 
 class PIPEInterfaceError(PCIeGatewareError):
 	''' Subset of PCIe Gateware errors specific to construction of the PIPE interface. '''
-	pass
+
+	__slots__ = ()
@@ -1,36 +1,43 @@
 #!/usr/bin/env python3
 # SPDX-License-Identifier: BSD-3-Clause
 import sys
-import logging    as log
-from pathlib      import Path
-from argparse     import ArgumentParser, ArgumentDefaultsHelpFormatter
-from os           import getenv
-from rich.logging import RichHandler
+import logging       as log
+from atexit          import register as atexit_register
+from pathlib         import Path
+from argparse        import ArgumentParser, ArgumentDefaultsHelpFormatter, HelpFormatter, Namespace
+from collections.abc import Callable
+from os              import getenv
+from os.path         import dirname, isdir, join, realpath
+from typing          import TYPE_CHECKING
 
 try:
-	from bakeneko.support.sys_dev import PCIDevice, LinkStatus, LinkCapabilities
+	from bakeneko.support.sys_dev import HAS_FABRIC, PCIDevice, LinkStatus, LinkCapabilities, _check_slot_glob
 	from bakeneko.types.constants import LinkSpeed, LinkWidth
 except ImportError:
 	# Resolve $SRC_ROOT/contrib/scripts/../../
-	BAKENEKO_PATH = Path(__file__).resolve().parent.parent.parent
+	BAKENEKO_PATH = dirname(dirname(dirname(realpath(__file__))))
 
-	# Check to make sure we have the Bakeneko package dir
-	if (BAKENEKO_PATH / 'bakeneko').is_dir():
-		sys.path.append(str(BAKENEKO_PATH))
+	# Check to make sure we have the Bakeneko package dir, and that it's not already on the path
+	if BAKENEKO_PATH not in sys.path and isdir(join(BAKENEKO_PATH, 'bakeneko')):
+		sys.path.append(BAKENEKO_PATH)
 
 	# Second verse, same as the first
-	from bakeneko.support.sys_dev import PCIDevice, LinkStatus, LinkCapabilities
+	from bakeneko.support.sys_dev import HAS_FABRIC, PCIDevice, LinkStatus, LinkCapabilities, _check_slot_glob
 	from bakeneko.types.constants import LinkSpeed, LinkWidth
-try:
+
+if TYPE_CHECKING:
 	from fabric import Connection
-	_remote_connection: Connection | None = None
-	HAS_FABRIC = True
-except ImportError:
-	_remote_connection: None = None
-	HAS_FABRIC = False
+
+# NOTE(aki): Both fabric and rich are slow to import, so they are only pulled in once they are needed
+_remote_connection: 'Connection | None' = None
+
+# Remote connections keyed on (host, user, key), so repeated in-process use of `main()` reuses them
+_connection_pool: dict[tuple[str, str, str], 'Connection'] = {}
 
 
 def _setup_logging():
+	from rich.logging import RichHandler
+
 	log.basicConfig(
 		force    = True,
 		format   = '%(message)s',
@@ -41,8 +48,39 @@ def _setup_logging():
 		]
 	)
 
+_DETAILED_ARG = (('--detailed', '-D'), {'action': 'store_true', 'help': 'Display detailed information.'})
+
+# The verb, its description, and the arguments to add to its sub-parser
+_VERBS = (
+	('list',      'Enumerate and list all PCI(e) devices', (_DETAILED_ARG, )),
+	('info',      'Dump device information',               (_DETAILED_ARG, )),
+	('get-speed', 'Get the current link speed',            ()),
+	('set-speed', 'Set the link speed for the device',     ((('speed', ), {'type': int}), )),
+	('reset',     'Reset the device',                      ()),
+	('re-enum',   'Try to force device re-enumerations',   ()),
+)
+
+class _ArgumentParser(ArgumentParser):
+	'''
+	An :py:class:`ArgumentParser` that reuses a single formatter to validate each argument as it is
+	added, rather than making a new one (and re-probing the terminal size) every time.
+	'''
+
+	_validation_formatter: HelpFormatter | None = None
+
+	def add_argument(self, *args, **kwargs):
+		if (formatter := self._validation_formatter) is None:
+			formatter = self._validation_formatter = self._get_formatter()
+
+		# NOTE(aki): Only shadow `_get_formatter` while adding the argument, help output needs a fresh one
+		self._get_formatter = lambda: formatter
+		try:
+			return super().add_argument(*args, **kwargs)
+		finally:
+			del self._get_formatter
+
 def _setup_args() -> ArgumentParser:
-	parser = ArgumentParser(
+	parser = _ArgumentParser(
 		prog            = Path(__file__).name,
 		description     = 'Bakeneko PCIe device utility',
 		formatter_class = ArgumentDefaultsHelpFormatter
@@ -56,7 +94,7 @@ def _setup_args() -> ArgumentParser:
 
 	parser.add_argument(
 		'--device', '-d',
-		help     = 'The PCIe Device to interact with',
+		help     = 'The PCIe Device to interact with, for `list` this can be a glob e.g. `01:*`',
 	)
 
 	if HAS_FABRIC:
@@ -86,34 +124,37 @@ def _setup_args() -> ArgumentParser:
 		dest = 'verb', required = True
 	)
 
-	verb_parsers.add_parser(
-		'list'     , description = 'Enumerate and list all PCI(e) devices'
-	).add_argument('--detailed', '-D', action = 'store_true', help = 'Display detailed information.')
-	verb_parsers.add_parser(
-		'info'     , description = 'Dump device information'
-	).add_argument('--detailed', '-D', action = 'store_true', help = 'Display detailed information.')
-	verb_parsers.add_parser('get-speed', description = 'Get the current link speed')
-	verb_parsers.add_parser(
-		'set-speed', description = 'Set the link speed for the device'
-	).add_argument('speed', type = int)
-	verb_parsers.add_parser('reset'    , description = 'Reset the device')
-	verb_parsers.add_parser('re-enum'  , description = 'Try to force device re-enumerations')
+	for verb, description, verb_args in _VERBS:
+		verb_parser = verb_parsers.add_parser(verb, description = description)
+		for names, kwargs in verb_args:
+			verb_parser.add_argument(*names, **kwargs)
 
 	return parser
 
 
 def _setup_connection(args):
-	# No remote bits were specified
-	if not all((args.user, args.host, args.key)):
+	# No fabric, or no remote bits were specified
+	if not HAS_FABRIC or not all((args.user, args.host, args.key)):
 		return
 
+	from bakeneko.support.sys_dev import RemoteConnection
+
 	global _remote_connection
-	if HAS_FABRIC and _remote_connection is None:
-		_remote_connection = Connection(
+	key = (args.host, args.user, str(args.key))
+	# NOTE(aki): If a pooled connection has dropped, fabric will re-open it on the next command
+	if (conn := _connection_pool.get(key)) is None:
+		conn = _connection_pool[key] = RemoteConnection(
 			args.host, args.user, connect_kwargs = {
 				'key_filename': str(args.key)
 			}
 		)
+	_remote_connection = conn
+
+@atexit_register
+def _close_connections() -> None:
+	for conn in _connection_pool.values():
+		conn.close()
+	_connection_pool.clear()
 
 def _get_device(args) -> PCIDevice | None:
 	if _remote_connection is not None:
@@ -122,33 +163,56 @@ def _get_device(args) -> PCIDevice | None:
 		dev = PCIDevice.get(args.device)
 
 	if dev is None:
-		log.error(f'Invalid PCIe device {args.device}')
+		log.error('Invalid PCIe device %s', args.device)
 
 	return dev
 
-def _get_devices() -> list[PCIDevice]:
+def _get_devices(glob: str | None) -> list[PCIDevice]:
+	if glob is None:
+		glob = '*'
+	# Like with a single device, allow the PCI domain to be left off
+	elif glob.count(':') == 1:
+		glob = f'0000:{glob}'
+
 	if _remote_connection is not None:
-		return PCIDevice.enumerate_remote(_remote_connection)
-	return PCIDevice.enumerate()
+		return PCIDevice.enumerate_remote(_remote_connection, glob)
+	return PCIDevice.enumerate(glob)
+
+# NOTE(aki): Each of these is emitted as a single multi-line record rather than one per line, so we
+#            only go through the logging (and rich) machinery once per block.
+_LINK_STATUS_FMT = '\n'.join((
+	'   => Speed:            %s',
+	'   => Width:            %s',
+	'   => Is Training:      %s',
+	'   => Using Slot Clock: %s',
+	'   => DLL Active:       %s',
+))
+
+_LINK_CAPABILITIES_FMT = '\n'.join((
+	'   => Max Speed:          %s',
+	'   => Max Width:          %s',
+	'   => Port Number:        %s',
+	'   => Active State PM:    %s',
+	'   => L0S Exit Latency:   %s',
+	'   => L1 Exit Latency:    %s',
+	'   => SPDE Reporting:     %s',
+	'   => DLLA Reporting:     %s',
+	'   => LBWN Reporting:     %s',
+	'   => ASPM Opt Complaint: %s',
+))
 
 def _print_link_status(ls: LinkStatus) -> None:
-	log.info(f'   => Speed:            {ls.link_speed}')
-	log.info(f'   => Width:            {ls.link_width}')
-	log.info(f'   => Is Training:      {ls.link_training}')
-	log.info(f'   => Using Slot Clock: {ls.slot_clock}')
-	log.info(f'   => DLL Active:       {ls.dll_active}')
+	log.info(
+		_LINK_STATUS_FMT,
+		ls.link_speed, ls.link_width, ls.link_training, ls.slot_clock, ls.dll_active
+	)
 
 def _print_link_capabilities(lc: LinkCapabilities) -> None:
-	log.info(f'   => Max Speed:          {lc.max_speed}')
-	log.info(f'   => Max Width:          {lc.max_width}')
-	log.info(f'   => Port Number:        {lc.port_number}')
-	log.info(f'   => Active State PM:    {lc.active_state_pm}')
-	log.info(f'   => L0S Exit Latency:   {lc.l0s_exit_latency}')
-	log.info(f'   => L1 Exit Latency:    {lc.l1_exit_latency}')
-	log.info(f'   => SPDE Reporting:     {lc.spde_reporting}')
-	log.info(f'   => DLLA Reporting:     {lc.dlla_reporting}')
-	log.info(f'   => LBWN Reporting:     {lc.lbwn_reporting}')
-	log.info(f'   => ASPM Opt Complaint: {lc.aspmop_compliant}')
+	log.info(
+		_LINK_CAPABILITIES_FMT,
+		lc.max_speed, lc.max_width, lc.port_number, lc.active_state_pm, lc.l0s_exit_latency,
+		lc.l1_exit_latency, lc.spde_reporting, lc.dlla_reporting, lc.lbwn_reporting, lc.aspmop_compliant
+	)
 
 
 def _print_info(dev: PCIDevice, args) -> None:
@@ -162,13 +226,81 @@ def _print_info(dev: PCIDevice, args) -> None:
 			_print_link_status(link_status)
 	else:
 		if (max_speed := dev.max_speed) != LinkSpeed.UNKNOWN:
-			log.info(f' => Max Link Speed: {max_speed}')
+			log.info(' => Max Link Speed: %s', max_speed)
 		if (max_width := dev.max_width) != LinkWidth.UNKNOWN:
-			log.info(f' => Max Link Width: {max_width}')
+			log.info(' => Max Link Width: %s', max_width)
 		if (curr_speed := dev.link_speed) != LinkSpeed.UNKNOWN:
-			log.info(f' => Current Speed: {curr_speed}')
+			log.info(' => Current Speed: %s', curr_speed)
 		if (curr_width := dev.link_width) != LinkWidth.UNKNOWN:
-			log.info(f' => Current Width: {curr_width}')
+			log.info(' => Current Width: %s', curr_width)
+
+# The handler for each verb, they take the parsed arguments and return the exit code
+_VERB_HANDLERS: dict[str, Callable[[Namespace], int]] = {}
+
+def _verb(name: str, *, device: bool = True) -> Callable:
+	'''
+	Register the decorated function as the handler for the given verb.
+
+	If ``device`` is set, the handler is called with the device selected with ``--device`` as
+	well as the arguments, and the verb fails if there is no such device.
+	'''
+
+	def _register(func: Callable) -> Callable:
+		if not device:
+			_VERB_HANDLERS[name] = func
+			return func
+
+		def _handler(args: Namespace) -> int:
+			if (dev := _get_device(args)) is None:
+				return 1
+			return func(dev, args)
+
+		_VERB_HANDLERS[name] = _handler
+		return func
+	return _register
+
+@_verb('get-speed')
+def _verb_get_speed(dev: PCIDevice, args: Namespace) -> int:
+	print(f'Current device speed: {dev.link_speed}')
+	return 0
+
+@_verb('set-speed')
+def _verb_set_speed(dev: PCIDevice, args: Namespace) -> int:
+	requested_speed: int = args.speed
+
+	if requested_speed > dev.max_speed:
+		log.error('Device supports a maximum speed of %s', dev.max_speed)
+		return 1
+
+	return 0 if dev.set_speed(LinkSpeed(requested_speed)) else 1
+
+@_verb('reset')
+def _verb_reset(dev: PCIDevice, args: Namespace) -> int:
+	dev.reset()
+	return 0
+
+@_verb('info')
+def _verb_info(dev: PCIDevice, args: Namespace) -> int:
+	_print_info(dev, args)
+	return 0
+
+@_verb('re-enum')
+def _verb_re_enum(dev: PCIDevice, args: Namespace) -> int:
+	return 0 if dev.recycle() else 1
+
+@_verb('list', device = False)
+def _verb_list(args: Namespace) -> int:
+	# Reject a bad glob before touching the (possibly remote) system
+	if args.device is not None:
+		try:
+			_check_slot_glob(args.device)
+		except ValueError as e:
+			log.error('%s', e)
+			return 1
+
+	for dev in _get_devices(args.device):
+		_print_info(dev, args)
+	return 0
 
 def main() -> int:
 	_setup_logging()
@@ -183,45 +315,7 @@ def main() -> int:
 	# Set up the remote connection if we are doing so
 	_setup_connection(args)
 
-	match args.verb:
-		case 'get-speed':
-			if (dev := _get_device(args)) is not None:
-				print(f'Current device speed: {dev.link_speed}')
-			else:
-				return 1
-		case 'set-speed':
-			if (dev := _get_device(args)) is not None:
-				requested_speed: int = args.speed
-
-				if requested_speed > dev.max_speed:
-					log.error(f'Device supports a maximum speed of {dev.max_speed}')
-					return 1
-
-				if not dev.set_speed(LinkSpeed(requested_speed)):
-					return 1
-			else:
-				return 1
-		case 'reset':
-			if (dev := _get_device(args)) is not None:
-				dev.reset()
-			else:
-				return 1
-		case 'info':
-			if (dev := _get_device(args)) is not None:
-				_print_info(dev, args)
-			else:
-				return 1
-		case 're-enum':
-			if (dev := _get_device(args)) is not None:
-				if not dev.recycle():
-					return 1
-			else:
-				return 1
-		case 'list':
-			for dev in _get_devices():
-				_print_info(dev, args)
-
-	return 0
+	return _VERB_HANDLERS[args.verb](args)
 
 if __name__ == '__main__':
 	raise SystemExit(main())
@@ -2,7 +2,7 @@
 
 from unittest                 import TestCase
 
-from bakeneko.physical.coding import K, D, Symbol, Symbols
+from bakeneko.physical.coding import K, D, KNOWN_CONTROL_SYMBOLS, Symbol, Symbols, classify_symbols
 
 class BakenekoPhysicalCodingTest(TestCase):
 
@@ -10,9 +10,17 @@ class BakenekoPhysicalCodingTest(TestCase):
 		self.assertEqual(K(28, 0), 0x11C)
 		self.assertEqual(K(28, 1), 0x13C)
 
+		for x, y in ((28, -3), (32, 0), (0, 8)):
+			with self.assertRaises(ValueError):
+				K(x, y)
+
 	def test_d_sym(self) -> None:
 		self.assertEqual(D(31, 1), 0x3F)
 
+		for x, y in ((-1, -1), (32, 0), (0, 8)):
+			with self.assertRaises(ValueError):
+				D(x, y)
+
 	def test_symbol(self) -> None:
 		for sym in Symbols:
 			val = sym.value
@@ -28,7 +36,21 @@ class BakenekoPhysicalCodingTest(TestCase):
 		self.assertEqual(str(Symbol(D(30, 5))), 'D30.5')
 		self.assertEqual(str(Symbol(K(28, 4))), 'K28.4')
 		self.assertEqual(Symbol.from_bits(0b000_11100).value, (K(28, 0) & 0xFF))
+		self.assertIs(Symbol.from_bits(K(28, 5)), Symbols.COM.value)
+		self.assertIsNone(Symbol.from_bits(0x1EE))
+		self.assertEqual(Symbol.control('', K(28, 5)), Symbols.COM.value)
+		self.assertNotEqual(Symbol.data('', D(28, 5)), Symbols.COM.value)
+		self.assertIn(Symbol.from_bits(K(28, 0)), KNOWN_CONTROL_SYMBOLS)
+		self.assertNotIn(Symbol.data('', D(1, 2)), KNOWN_CONTROL_SYMBOLS)
 		self.assertEqual(
 			repr(Symbols.PAD.value),
 			'<Symbol: K23.7, value=0xF7, name=\'PAD\', desc=\'LTSSM Initialization\'>'
 		)
+
+	def test_classify_symbols(self) -> None:
+		symbols = tuple(Symbols)
+
+		self.assertEqual(
+			classify_symbols((K(28, 5), K(28, 0), D(1, 2), 0x1EE)),
+			[ symbols.index(Symbols.COM), symbols.index(Symbols.SKP), -1, -2 ]
+		)
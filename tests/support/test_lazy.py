@@ -0,0 +1,20 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+from unittest              import TestCase
+
+from bakeneko.support.lazy import lazy_imports
+
+class BakenekoLazyImportsTest(TestCase):
+
+	def test_lazy_imports(self) -> None:
+		module_globals = { '__name__': 'bakeneko.support', '__package__': 'bakeneko.support' }
+		getattr_ = lazy_imports(module_globals, { 'PCIDevice': '.sys_dev' })
+
+		from bakeneko.support.sys_dev import PCIDevice
+
+		self.assertIs(getattr_('PCIDevice'), PCIDevice)
+		# Once imported it's kept in the module so `__getattr__` isn't hit again
+		self.assertIs(module_globals['PCIDevice'], PCIDevice)
+
+		with self.assertRaisesRegex(AttributeError, r"^module 'bakeneko.support' has no attribute 'LinkSpeed'$"):
+			getattr_('LinkSpeed')
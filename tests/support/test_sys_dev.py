@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+from pathlib                  import Path
+from tempfile                 import TemporaryDirectory
+from unittest                 import TestCase
+
+from bakeneko.support.sys_dev import (
+	_LINK_REGISTERS, _PartialConfigAccess, _check_slot_glob, _parse_registers, _parse_setpci_ops, _parse_uevent,
+	_pci_config_access,
+)
+
+class BakenekoSysDevParsingTest(TestCase):
+
+	def test_parse_setpci_ops(self) -> None:
+		self.assertEqual(
+			_parse_setpci_ops('CAP_EXP+12.W 04.B=06 CAP_EXP+10.W=20:20'),
+			[ (True, 0x12, 2, None, 0xFFFF), (False, 0x04, 1, 0x06, 0xFF), (True, 0x10, 2, 0x20, 0x20) ]
+		)
+		self.assertEqual(_parse_setpci_ops(''), [])
+		# Anything that isn't a plain register access is left to `setpci`
+		self.assertIsNone(_parse_setpci_ops('COMMAND'))
+		self.assertIsNone(_parse_setpci_ops('04.W ECAP_AER+04.L'))
+		self.assertIsNone(_parse_setpci_ops('04.Q'))
+
+	def test_parse_registers(self) -> None:
+		self.assertEqual(
+			_parse_registers(_LINK_REGISTERS, '0042\n0003f442\n1011\n'), (0x0042, 0x0003F442, 0x1011)
+		)
+		self.assertEqual(_parse_registers(_LINK_REGISTERS, None), (None, None, None))
+		# Wrong number of values
+		self.assertEqual(_parse_registers(_LINK_REGISTERS, '0042\n1011\n'), (None, None, None))
+		# Wrong width or not hex
+		self.assertEqual(
+			_parse_registers(_LINK_REGISTERS, '42\n0003f442\nzzzz\n'), (None, 0x0003F442, None)
+		)
+
+	def test_parse_uevent(self) -> None:
+		self.assertEqual(
+			_parse_uevent('DRIVER=nvme\nPCI_ID=144D:A808\nPCI_SLOT_NAME=0000:01:00.0\nMODALIAS=pci:v0000144D\n\n'),
+			{
+				'DRIVER':        'nvme',
+				'PCI_ID':        '144D:A808',
+				'PCI_SLOT_NAME': '0000:01:00.0',
+				'MODALIAS':      'pci:v0000144D',
+			}
+		)
+		self.assertEqual(_parse_uevent('garbage\nKEY = a=b\n'), { 'KEY': 'a=b' })
+
+	def test_check_slot_glob(self) -> None:
+		self.assertEqual(_check_slot_glob('*'), '*')
+		self.assertEqual(_check_slot_glob('0000:0A:*'), '0000:0a:*')
+		self.assertEqual(_check_slot_glob('0000:00:0[1-3].?'), '0000:00:0[1-3].?')
+
+		for glob in ('', '0000:00:01.0;ls', '$(id)', '../*', '0000:00:01.0 *'):
+			with self.assertRaises(ValueError):
+				_check_slot_glob(glob)
+
+class BakenekoSysDevConfigAccessTest(TestCase):
+
+	def setUp(self) -> None:
+		self._dir = TemporaryDirectory()
+		self.config = Path(self._dir.name) / 'config'
+
+		# A 64 byte config space, like unprivileged users get, with only the PCI Express Capability at 0x40
+		data = bytearray(64)
+		data[0x06] = 0x10
+		data[0x34] = 0x40
+		self.config.write_bytes(bytes(data) + bytes((0x10, 0x00, 0x42, 0x00)))
+
+	def tearDown(self) -> None:
+		self._dir.cleanup()
+
+	def test_access(self) -> None:
+		self.assertEqual(_pci_config_access(self.config, _parse_setpci_ops('CAP_EXP+02.W 06.B')), '0042\n10\n')
+
+		self.assertEqual(_pci_config_access(self.config, _parse_setpci_ops('04.W=0506 04.B=f0:f0 04.W')), '05f6\n')
+
+	def test_failure_before_write(self) -> None:
+		before = self.config.read_bytes()
+
+		# A failure before any writes can be retried with `setpci`
+		with self.assertRaises(ValueError):
+			_pci_config_access(self.config, _parse_setpci_ops('80.L 04.W=0006'))
+		self.assertEqual(self.config.read_bytes(), before)
+
+	def test_failure_after_write(self) -> None:
+		# But after a write it must not be, as that would repeat the write
+		with self.assertRaises(_PartialConfigAccess):
+			_pci_config_access(self.config, _parse_setpci_ops('04.W=0006 80.L'))
+		self.assertEqual(self.config.read_bytes()[0x04:0x06], b'\x06\x00')
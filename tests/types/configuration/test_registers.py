@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import pickle
+from copy                                   import deepcopy
+from unittest                               import TestCase
+
+from construct                              import ConstructError, Struct
+
+from bakeneko.types.configuration.registers import Register, pci_compatible
+
+REGISTERS = tuple(
+	(name, reg) for name, reg in vars(pci_compatible).items() if isinstance(reg, Register)
+)
+
+def _outcome(func, *args) -> object:
+	''' The result of the call, or the type of exception it raised '''
+	try:
+		return func(*args)
+	except Exception as e:
+		return type(e)
+
+class BakenekoRegistersTest(TestCase):
+
+	def _samples(self, reg: Register) -> tuple[bytes, ...]:
+		size = reg.sizeof()
+		return (bytes(size), b'\xFF' * size, bytes(range(size)), bytes(range(size + 4)))
+
+	def _assertMatchesInterpreted(self, reg: Register, interpreted: Register) -> None:
+		for data in self._samples(interpreted):
+			parsed = Struct.parse(interpreted, data)
+			self.assertEqual(reg.parse(data), parsed)
+			self.assertEqual(_outcome(reg.build, parsed), _outcome(Struct.build, interpreted, parsed))
+
+		# Short data must still raise construct's own errors
+		for data in (b'', b'\xA5' * (interpreted.sizeof() - 1)):
+			with self.assertRaises(ConstructError):
+				reg.parse(data)
+
+	def test_compiled(self) -> None:
+		for name, reg in REGISTERS:
+			with self.subTest(register = name):
+				self._assertMatchesInterpreted(reg, reg)
+
+	def test_copy(self) -> None:
+		for name, reg in REGISTERS:
+			with self.subTest(register = name):
+				# Make sure the original has been compiled before copying it
+				reg.parse(bytes(reg.sizeof()))
+				self._assertMatchesInterpreted(deepcopy(reg), reg)
+				self._assertMatchesInterpreted(pickle.loads(pickle.dumps(reg)), reg)
+
+	def test_fallback(self) -> None:
+		Command = pci_compatible.Command
+
+		# Values that don't fit their 1-bit fields, which the compiled codec raises a `ValueError` for
+		obj = Struct.parse(Command, b'\x02' * Command.sizeof())
+		with self.assertRaises(ValueError):
+			Command._get_compiled().build(obj)
+		# But going through the register still gets construct's error from the interpreted one
+		with self.assertRaises(ConstructError):
+			Command.build(obj)
+
+		# Anything other than bad data isn't hidden
+		with self.assertRaises(TypeError):
+			pci_compatible.VendorID.build(5)
@@ -2,7 +2,10 @@
 
 from unittest                 import TestCase
 
-from bakeneko.types.constants import LinkSpeed, LinkWidth, PCIeStandard
+from bakeneko.types.constants import (
+	LinkSpeed, LinkWidth, PCIeStandard, VALID_PCIE_CONFIGURATIONS, VALID_PCIE_CONFIGURATIONS_BY_STANDARD,
+	VALID_WIDTHS_BY_SPEED
+)
 
 class BakenekoTypesConstantsTest(TestCase):
 
@@ -47,6 +50,8 @@ class BakenekoTypesConstantsTest(TestCase):
 		self.assertEqual(LinkSpeed.from_str('256.0 GT/s PCIe'), LinkSpeed.UNKNOWN)
 		self.assertEqual(str(LinkSpeed.UNKNOWN), 'Unknown')
 
+		self.assertEqual(LinkSpeed.from_str(' 8.0  GT/s PCIe\n'), LinkSpeed.LS8_0)
+
 	def test_link_width(self) -> None:
 		self.assertEqual(LinkWidth.X1, 1)
 		self.assertEqual(str(LinkWidth.X1), 'x1')
@@ -88,6 +93,9 @@ class BakenekoTypesConstantsTest(TestCase):
 		self.assertEqual(LinkWidth.from_str('x128'), LinkWidth.UNKNOWN)
 		self.assertEqual(LinkWidth(0), LinkWidth.UNKNOWN)
 
+		self.assertEqual(LinkWidth.from_str('x16\n'), LinkWidth.X16)
+		self.assertEqual(LinkWidth.from_str('4'), LinkWidth.X4)
+
 	def test_pcie_standard(self) -> None:
 		self.assertEqual(str(PCIeStandard.PCIE_1), 'v1.1')
 		self.assertEqual(str(PCIeStandard.PCIE_2), 'v2.1')
@@ -96,3 +104,12 @@ class BakenekoTypesConstantsTest(TestCase):
 		self.assertEqual(str(PCIeStandard.PCIE_5), 'v5.0')
 		self.assertEqual(str(PCIeStandard.PCIE_6), 'v6.0')
 		self.assertEqual(str(PCIeStandard.PCIE_7), 'v7.0')
+
+	def test_valid_configurations(self) -> None:
+		for cfg in VALID_PCIE_CONFIGURATIONS:
+			self.assertIs(VALID_PCIE_CONFIGURATIONS_BY_STANDARD[cfg.standard], cfg)
+			for speed in cfg.link_speeds:
+				self.assertEqual(VALID_WIDTHS_BY_SPEED[speed], frozenset(cfg.link_widths))
+
+		self.assertIn(LinkWidth.X12, VALID_WIDTHS_BY_SPEED[LinkSpeed.LS2_5])
+		self.assertNotIn(LinkWidth.X12, VALID_WIDTHS_BY_SPEED[LinkSpeed.LS64_0])
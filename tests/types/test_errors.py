@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
+import pickle
 from unittest                 import TestCase
 
 from bakeneko.types.constants import LinkSpeed, LinkWidth, PCIeStandard
@@ -62,3 +63,35 @@ class BakenekoTypesErrorsTest(TestCase):
 				self.assertEqual(e.link_speed,    LinkSpeed.LS64_0)
 				self.assertEqual(e.link_width,    LinkWidth.X12)
 				raise e
+
+	def test_args_and_pickle(self) -> None:
+		EXCEPTIONS = (
+			(
+				PCIeUnsupportedLinkSpeed(LinkSpeed.LS16_0, (LinkSpeed.LS2_5, LinkSpeed.LS5_0)),
+				(LinkSpeed.LS16_0, (LinkSpeed.LS2_5, LinkSpeed.LS5_0)),
+				('requested_speed', 'supported_speeds'),
+			),
+			(
+				PCIeUnsupportedLinkWidth(LinkWidth.X8, (LinkWidth.X1, LinkWidth.X2)),
+				(LinkWidth.X8, (LinkWidth.X1, LinkWidth.X2)),
+				('requested_width', 'supported_widths'),
+			),
+			(
+				PCIeUnsupportedConfiguration(PCIeStandard.PCIE_2, LinkSpeed.LS64_0, LinkWidth.X12),
+				(PCIeStandard.PCIE_2, LinkSpeed.LS64_0, LinkWidth.X12),
+				('pcie_standard', 'link_speed', 'link_width'),
+			),
+		)
+
+		for exception, args, attrs in EXCEPTIONS:
+			with self.subTest(exception = type(exception).__name__):
+				# The raw values are kept as the args, and only formatted for `str()`
+				self.assertEqual(exception.args, args)
+				self.assertEqual(repr(exception), f'{type(exception).__name__}{args!r}')
+
+				copy = pickle.loads(pickle.dumps(exception))
+				self.assertIs(type(copy), type(exception))
+				self.assertEqual(copy.args, exception.args)
+				self.assertEqual(str(copy), str(exception))
+				for attr in attrs:
+					self.assertEqual(getattr(copy, attr), getattr(exception, attr))